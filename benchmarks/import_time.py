@@ -0,0 +1,84 @@
+"""
+Import time of the integration on top of the Home Assistant modules loaded at boot.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRELOAD = [
+    "homeassistant.config_entries",
+    "homeassistant.core",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_registry",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.storage",
+]
+
+
+def measure(module):
+    code = "import " + ", ".join(PRELOAD) + "; import " + module
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # lines are "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[0].strip().split(":")[-1].strip().isdigit():
+            continue
+        modules.append(
+            (fields[2].strip(), int(fields[0].split(":")[1]), int(fields[1]))
+        )
+
+    # only what is imported after the last preloaded module counts
+    start = max(index for index, module in enumerate(modules) if module[0] in PRELOAD)
+    return modules[start + 1 :]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--module", default="custom_components.gigasetelements")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="fail above this median")
+    args = parser.parse_args(argv)
+
+    totals = []
+    for _ in range(args.runs):
+        modules = measure(args.module)
+        totals.append(next(total for name, _, total in modules if name == args.module))
+
+    median = statistics.median(totals) / 1000
+    top = sorted(modules, key=lambda module: module[1], reverse=True)[: args.top]
+    print(
+        json.dumps(
+            {
+                "module": args.module,
+                "runs": args.runs,
+                "median_ms": round(median, 1),
+                "min_ms": round(min(totals) / 1000, 1),
+                "top_self_ms": {name: round(own / 1000, 1) for name, own, _ in top},
+            },
+            indent=2,
+        )
+    )
+
+    if args.max_ms is not None and median > args.max_ms:
+        print("Import time %.1f ms exceeds %.1f ms" % (median, args.max_ms))
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
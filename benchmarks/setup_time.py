@@ -0,0 +1,223 @@
+"""
+Setup time of a replayed account, for the client alone and as a config entry.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from custom_components.gigasetelements.const import DOMAIN  # noqa: E402
+from custom_components.gigasetelements.gigaset.client import (  # noqa: E402
+    GigasetelementsClientAPI,
+)
+from custom_components.gigasetelements.gigaset.const import (  # noqa: E402
+    TRANSPORT_REPLAY,
+    URL_GSE_API,
+    URL_GSE_AUTH,
+    URL_GSE_CLOUD,
+)
+from custom_components.gigasetelements.gigaset.transport import (  # noqa: E402
+    GigasetelementsTransport,
+    journal_key,
+)
+
+SENSOR_TYPES = ["ds02", "ws02", "is01", "sd01", "sp01", "ts01", "cl01", "um01"]
+
+
+class ErrorLog(logging.Handler):
+    # a failed platform setup is only logged, a partial setup must not pass
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.errors = []
+
+    def emit(self, record):
+        self.errors.append(record.getMessage())
+
+
+def entry(method, url, body, content_type="application/json"):
+    return {
+        "t": 0,
+        "d": 0,
+        "k": journal_key(method, url),
+        "p": "",
+        "s": 200,
+        "r": "OK",
+        "c": content_type,
+        "b": body if isinstance(body, str) else json.dumps(body),
+    }
+
+
+def write_journal(path, sensors):
+    subelements = [
+        {
+            "id": "F0A1.%04x" % index,
+            "type": "bs01." + SENSOR_TYPES[index % len(SENSOR_TYPES)],
+            "friendlyName": "sensor %s" % index,
+            "connectionStatus": "online",
+            "firmwareStatus": "up_to_date",
+            "positionStatus": "closed",
+            "states": {"relay": "off", "temperature": 20.0, "setPoint": 20},
+        }
+        for index in range(sensors)
+    ]
+    elements = {
+        "bs01": [
+            {
+                "id": "F0A1",
+                "friendlyName": "base",
+                "connectionStatus": "online",
+                "firmwareStatus": "up_to_date",
+                "subelements": subelements,
+            }
+        ]
+    }
+    modes = [
+        {mode: {"privacy_mode": False}} for mode in ["home", "away", "custom", "night"]
+    ]
+    intrusion = {
+        "intrusion_settings": {
+            "active_mode": "home",
+            "requestedMode": "home",
+            "modeTransitionInProgress": False,
+            "modes": modes,
+        }
+    }
+    dashboard = {
+        "result": {
+            "recentEventsNumber": 0,
+            "recentEventCounts": {"yc01.recording": 0},
+            "recentHomecomings": [],
+            "recentHomeleavings": [],
+        }
+    }
+
+    rows = [
+        entry("GET", URL_GSE_CLOUD, {"isMaintenance": False}, "text/plain"),
+        entry("POST", URL_GSE_AUTH, ""),
+        entry("GET", URL_GSE_API + "/v1/auth/openid/begin?op=gigaset", "", "text/html"),
+        entry("GET", URL_GSE_API + "/v2/me/elements", elements),
+        entry("GET", URL_GSE_API + "/v3/me/user/intrusion-settings", intrusion),
+        entry("GET", URL_GSE_API + "/v3/me/health", {"systemHealth": "green"}),
+        entry("GET", URL_GSE_API + "/v1/me/events/dashboard?timezone=UTC", dashboard),
+        entry("GET", URL_GSE_API + "/v2/me/events?limit=100", {"events": []}),
+    ]
+    with gzip.open(path, "wt", encoding="utf-8") as journal:
+        for row in rows:
+            journal.write(json.dumps(row) + "\n")
+
+
+def client_setup(journal):
+    start = time.perf_counter()
+    transport = GigasetelementsTransport(
+        None, mode=TRANSPORT_REPLAY, journal=journal, speed=0
+    )
+    client = GigasetelementsClientAPI(
+        "benchmark", "benchmark", None, False, "UTC", True, False, transport
+    )
+    client.refresh()
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    return elapsed
+
+
+async def entry_setup(journal, config_dir):
+    from homeassistant import auth, config_entries, core, loader
+    from homeassistant.helpers import area_registry, device_registry
+    from homeassistant.helpers import entity, entity_registry, issue_registry
+    from homeassistant.helpers import translation
+    from homeassistant.setup import async_setup_component
+
+    hass = core.HomeAssistant(config_dir)
+    hass.config.set_time_zone("UTC")
+    loader.async_setup(hass)
+    translation.async_setup(hass)
+    entity.async_setup(hass)
+    for registry in [area_registry, device_registry, entity_registry, issue_registry]:
+        await registry.async_load(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    # the camera platform depends on http, which needs auth but no listener
+    hass.auth = await auth.auth_manager_from_config(hass, [], [])
+    await async_setup_component(hass, "http", {"http": {}})
+    hass.set_state(core.CoreState.running)
+
+    config = {
+        DOMAIN: {
+            "name": "benchmark",
+            "username": "benchmark",
+            "password": "benchmark",
+            "transport": TRANSPORT_REPLAY,
+            "journal": journal,
+            "replay_speed": 0,
+        }
+    }
+    start = time.perf_counter()
+    await async_setup_component(hass, DOMAIN, config)
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - start
+    entities = len(hass.states.async_all())
+    states = [entry.state.value for entry in hass.config_entries.async_entries(DOMAIN)]
+
+    await hass.async_stop(force=True)
+
+    return elapsed, entities, states
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--sensors", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, help="fail above this entry setup")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    errors = ErrorLog()
+    logging.getLogger().addHandler(errors)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.symlink(
+            os.path.join(ROOT, "custom_components"),
+            os.path.join(config_dir, "custom_components"),
+        )
+        journal = os.path.join(config_dir, "benchmark.jsonl.gz")
+        write_journal(journal, args.sensors)
+
+        client = min(client_setup(journal) for _ in range(args.runs))
+        setup, entities, states = asyncio.run(entry_setup(journal, config_dir))
+
+    print(
+        json.dumps(
+            {
+                "sensors": args.sensors,
+                "client_ms": round(client * 1000, 1),
+                "entry_ms": round(setup * 1000, 1),
+                "entities": entities,
+                "entry_states": states,
+                "errors": len(errors.errors),
+            },
+            indent=2,
+        )
+    )
+
+    if errors.errors or states != ["loaded"]:
+        print("Setup did not complete, the measurement is not valid")
+        return 1
+
+    if args.max_ms is not None and setup * 1000 > args.max_ms:
+        print("Entry setup %.1f ms exceeds %.1f ms" % (setup * 1000, args.max_ms))
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,11 @@
 """
 Gigaset Elements platform that offers a control over alarm status.
 """
-import json
 import logging
 import time
 
-from datetime import datetime
-from urllib.parse import urlparse
+from datetime import timedelta
+from functools import wraps
 
 import homeassistant.helpers.config_validation as cv
 import requests
@@ -20,555 +19,502 @@
     CONF_USERNAME,
     EVENT_HOMEASSISTANT_STARTED,
     EVENT_HOMEASSISTANT_STOP,
-    STATE_ALARM_ARMING,
-    STATE_ALARM_DISARMED,
-    STATE_ALARM_DISARMING,
-    STATE_ALARM_TRIGGERED,
-    STATE_IDLE,
     STATE_OFF,
     STATE_ON,
-    STATE_UNKNOWN,
 )
-from homeassistant.core import CoreState
-from homeassistant.helpers.discovery import async_load_platform
-from requests.packages.urllib3.util.retry import Retry
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import CoreState, SupportsResponse, callback
+from homeassistant.exceptions import (
+    ConfigEntryAuthFailed,
+    ConfigEntryNotReady,
+    HomeAssistantError,
+)
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import call_later, track_time_interval
+from homeassistant.util import slugify
 
 from .const import (
-    API_CALLS_ALLOWED,
-    AUTH_GSE_EXPIRE,
-    BUTTON_PRESS_MAP,
+    ATTR_COMMANDS,
+    ATTR_COUNT,
+    ATTR_CYCLES,
+    ATTR_SENSOR_ID,
+    CAMERA_CACHE_DIR,
+    CAMERA_CACHE_SIZE,
     CONF_CODE_ARM_REQUIRED,
     CONF_ENABLE_DEBUG,
-    DEVICE_MODE_MAP,
-    DEVICE_TRIGGERS,
+    CONF_JOURNAL,
+    CONF_PROXY_PORT,
+    CONF_REPLAY_SPEED,
+    CONF_TRANSPORT,
     DOMAIN,
-    HEADER_GSE,
+    JOURNAL_FILE,
     PLATFORMS,
+    PROFILE_FILE,
+    SERVICE_BULK_COMMAND,
+    SERVICE_GET_HISTORY,
+    SERVICE_PROFILE,
     STARTUP,
-    URL_GSE_API,
-    URL_GSE_AUTH,
-    URL_GSE_CLOUD,
 )
+from .gigaset.client import GigasetelementsAuthError, GigasetelementsClientAPI
+from .gigaset.const import (
+    ARMING_POLL_INTERVAL,
+    ATTR_COMMAND,
+    ATTR_TARGET,
+    ATTR_VALUE,
+    DEVICE_MODE_MAP,
+    ELEMENTS_CHANGED,
+    EVENT_COMMAND,
+    EVENT_GSE,
+    EVENT_HISTORY_SIZE,
+    EVENT_MODE_CHANGED,
+    STATE_UPDATE_INTERVAL,
+    TARGET_TEMP_HIGH,
+    TARGET_TEMP_LOW,
+    TRANSITION_STARTED,
+    TRANSPORT_LIVE,
+    TRANSPORT_MODES,
+)
+from .gigaset.snapshots import SnapshotCache
+from .gigaset.transport import GigasetelementsTransport, create_session
+from .storage import GigasetelementsStore
 
 _LOGGER = logging.getLogger(__name__)
 
-_LOGGER.info(STARTUP)
+ACCOUNT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_USERNAME): cv.string,
+        vol.Required(CONF_PASSWORD): cv.string,
+        vol.Optional(CONF_NAME, default="gigaset_elements"): cv.string,
+        vol.Optional(CONF_SWITCHES, default=True): cv.boolean,
+        vol.Optional(CONF_CODE_ARM_REQUIRED, default=True): cv.boolean,
+        vol.Optional(CONF_CODE, "code validation"): cv.string,
+        vol.Optional(CONF_ENABLE_DEBUG, default=False): cv.boolean,
+        vol.Optional(CONF_TRANSPORT, default=TRANSPORT_LIVE): vol.In(TRANSPORT_MODES),
+        vol.Optional(CONF_JOURNAL): cv.string,
+        vol.Optional(CONF_PROXY_PORT): cv.port,
+        vol.Optional(CONF_REPLAY_SPEED, default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
 
 CONFIG_SCHEMA = vol.Schema(
     {
-        DOMAIN: vol.Schema(
-            {
-                vol.Required(CONF_USERNAME): cv.string,
-                vol.Required(CONF_PASSWORD): cv.string,
-                vol.Optional(CONF_NAME, default="gigaset_elements"): cv.string,
-                vol.Optional(CONF_SWITCHES, default=True): cv.boolean,
-                vol.Optional(CONF_CODE_ARM_REQUIRED, default=True): cv.boolean,
-                vol.Optional(CONF_CODE, "code validation"): cv.string,
-                vol.Optional(CONF_ENABLE_DEBUG, default=False): cv.boolean,
-            }
-        ),
+        DOMAIN: vol.All(cv.ensure_list, [ACCOUNT_SCHEMA]),
     },
     extra=vol.ALLOW_EXTRA,
 )
 
-retry_strategy = Retry(
-    total=5,
-    backoff_factor=2,
-    status_forcelist=[429, 500, 502, 503, 504],
-    allowed_methods=["DELETE", "GET", "POST"],
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Required(ATTR_SENSOR_ID): cv.string,
+        vol.Optional(ATTR_COUNT, default=10): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=EVENT_HISTORY_SIZE)
+        ),
+    }
+)
+
+BULK_COMMAND_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Required(ATTR_COMMANDS): vol.All(
+            cv.ensure_list,
+            [
+                vol.Any(
+                    vol.Schema(
+                        {
+                            vol.Required(ATTR_COMMAND): "alarm",
+                            vol.Required(ATTR_VALUE): vol.In(DEVICE_MODE_MAP),
+                        }
+                    ),
+                    vol.Schema(
+                        {
+                            vol.Required(ATTR_COMMAND): "plug",
+                            vol.Required(ATTR_TARGET): cv.string,
+                            vol.Required(ATTR_VALUE): vol.In([STATE_ON, STATE_OFF]),
+                        }
+                    ),
+                    vol.Schema(
+                        {
+                            vol.Required(ATTR_COMMAND): "privacy",
+                            vol.Required(ATTR_TARGET): vol.In(DEVICE_MODE_MAP),
+                            vol.Required(ATTR_VALUE): cv.boolean,
+                        }
+                    ),
+                    vol.Schema(
+                        {
+                            vol.Required(ATTR_COMMAND): "thermostat",
+                            vol.Required(ATTR_TARGET): cv.string,
+                            vol.Required(ATTR_VALUE): vol.All(
+                                vol.Coerce(float),
+                                vol.Range(min=TARGET_TEMP_LOW, max=TARGET_TEMP_HIGH),
+                            ),
+                        }
+                    ),
+                )
+            ],
+        ),
+    }
 )
 
-session = requests.Session()
-session.mount("https://", requests.adapters.HTTPAdapter(max_retries=retry_strategy))
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(ATTR_CYCLES, default=5): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
 
 
-def setup(hass, config):
+async def async_setup(hass, config):
     def toggle_api_updates(event):
-        global API_CALLS_ALLOWED
-        API_CALLS_ALLOWED = hass.state == CoreState.running
-        _LOGGER.debug("API calls enabled: " + str(API_CALLS_ALLOWED))
+        api_calls_allowed = hass.state == CoreState.running
+        for account in hass.data[DOMAIN].values():
+            account["client"].api_calls_allowed = api_calls_allowed
+        _LOGGER.debug("API calls enabled: " + str(api_calls_allowed))
+
+    _LOGGER.info(STARTUP)
+
+    hass.data[DOMAIN] = {}
 
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, toggle_api_updates)
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, toggle_api_updates)
 
-    username = config[DOMAIN].get(CONF_USERNAME)
-    password = config[DOMAIN].get(CONF_PASSWORD)
-    code = config[DOMAIN].get(CONF_CODE)
-    code_arm_required = config[DOMAIN].get(CONF_CODE_ARM_REQUIRED)
-    alarm_switch = config[DOMAIN].get(CONF_SWITCHES)
-    time_zone = str(hass.config.time_zone)
-    name = config[DOMAIN].get(CONF_NAME)
-    enable_debug = config[DOMAIN].get(CONF_ENABLE_DEBUG)
+    async_setup_services(hass)
 
-    _LOGGER.debug("Initializing %s client API", DOMAIN)
+    for account in config.get(DOMAIN, []):
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_IMPORT}, data=account
+            )
+        )
+
+    return True
 
-    client = GigasetelementsClientAPI(
-        username,
-        password,
-        code,
-        code_arm_required,
-        time_zone,
-        alarm_switch,
-        enable_debug,
-    )
 
-    hass.data[DOMAIN] = {"client": client, "name": name}
+async def async_setup_entry(hass, entry):
+    account = ACCOUNT_SCHEMA({**entry.data, **entry.options})
+    store = GigasetelementsStore(hass, account[CONF_NAME])
+
+    try:
+        client = await hass.async_add_executor_job(setup_client, hass, account, store)
+    except GigasetelementsAuthError as err:
+        raise ConfigEntryAuthFailed(err) from err
+    except (
+        KeyError,
+        TypeError,
+        ValueError,
+        requests.exceptions.RequestException,
+    ) as err:
+        raise ConfigEntryNotReady(err) from err
+
+    # spread the refresh cycles of all accounts evenly over one interval
+    entries = hass.config_entries.async_entries(DOMAIN)
+    offset = STATE_UPDATE_INTERVAL * entries.index(entry) / len(entries)
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "client": client,
+        "name": account[CONF_NAME],
+        "store": store,
+        "cancel": await hass.async_add_executor_job(
+            start_client, hass, entry, client, account, offset
+        ),
+    }
 
-    for platform in PLATFORMS:
-        _LOGGER.debug("Load platform %s", platform)
-        hass.async_create_task(async_load_platform(hass, platform, DOMAIN, {}, config))
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
-class GigasetelementsClientAPI:
-    def __init__(
-        self,
-        username,
-        password,
-        code,
-        code_arm_required,
-        time_zone,
-        alarm_switch,
-        enable_debug,
-    ):
-        self._username = username
-        self._password = password
-        self._time_zone = time_zone
-        self._alarm_switch = alarm_switch
-        self._code = code
-        self._code_arm_required = code_arm_required
-        self._enable_debug = enable_debug
-        self._mode_transition = False
-        self._target_state = STATE_ALARM_DISARMED
-        self._state = STATE_ALARM_DISARMED
-        self._health = STATE_UNKNOWN
-        self._last_event = str(int(time.time()) * 1000)
-        self._cloud = self._do_request("GET", URL_GSE_CLOUD).json()
-        self._last_authenticated = self._do_authorisation()
-        self._elements_data = self._do_request("GET", URL_GSE_API + "/v2/me/elements")
-        self._property_id = self._elements_data["bs01"][0]["id"]
-        self._intrusion_data = self._do_request(
-            "GET", URL_GSE_API + "/v3/me/user/intrusion-settings"
-        )
-        self._event_data = self._do_request(
-            "GET", URL_GSE_API + "/v2/me/events?limit=1"
-        )
-        self._health_data = self._do_request("GET", URL_GSE_API + "/v3/me/health")
-        self._dashboard_data = self._do_request(
-            "GET", URL_GSE_API + "/v1/me/events/dashboard?timezone=" + self._time_zone
-        )
+async def async_unload_entry(hass, entry):
+    unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unloaded:
+        account = hass.data[DOMAIN].pop(entry.entry_id)
+        await hass.async_add_executor_job(stop_client, account)
 
-        _LOGGER.debug("Property id: %s", self._property_id)
-        if self._enable_debug:
-            _LOGGER.warn("API response object: %s %s", "\n", self._elements_data)
-
-    @staticmethod
-    def _do_request(request_type, url, payload=""):
-        if request_type == "POST":
-            response = session.post(url, payload, headers=HEADER_GSE)
-        elif request_type == "PUT":
-            response = session.put(url, payload, headers=HEADER_GSE)
-        elif request_type == "DELETE":
-            response = session.delete(url)
-        else:
-            response = session.get(url, headers=HEADER_GSE)
-
-        if not response.ok:
-            _LOGGER.error(
-                "API request: [%s] %s %s",
-                response.status_code,
-                response.reason,
-                urlparse(url).path,
-            )
-        else:
-            _LOGGER.debug(
-                "API request: [%s] %s", response.status_code, urlparse(url).path
+    return unloaded
+
+
+async def async_reload_entry(hass, entry):
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def get_account(hass, name=None):
+    accounts = list(hass.data[DOMAIN].values())
+    if name is None and len(accounts) == 1:
+        return accounts[0]
+    for account in accounts:
+        if account["name"] == name:
+            return account
+    raise HomeAssistantError(f"Unknown {DOMAIN} account: {name}")
+
+
+@callback
+def async_setup_services(hass):
+    def get_history(call):
+        client = get_account(hass, call.data.get(CONF_NAME))["client"]
+        return {
+            "events": client.get_event_history(
+                call.data[ATTR_SENSOR_ID], call.data[ATTR_COUNT]
             )
+        }
 
-        return (
-            response.json()
-            if response.headers.get("content-type", "").startswith("application/json")
-            else response
+    def bulk_command(call):
+        client = get_account(hass, call.data.get(CONF_NAME))["client"]
+        return {"results": client.bulk_command(call.data[ATTR_COMMANDS])}
+
+    def profile(call):
+        account = get_account(hass, call.data.get(CONF_NAME))
+        account["client"].start_profiling(
+            call.data[ATTR_CYCLES],
+            hass.config.path(
+                PROFILE_FILE.format(slugify(account["name"]), int(time.time()))
+            ),
         )
 
-    def _do_authorisation(self):
-        if self._cloud["isMaintenance"]:
-            _LOGGER.error("API maintenance: %s", self._cloud["isMaintenance"])
-        _LOGGER.info("Authenticating")
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_COMMAND,
+        bulk_command,
+        schema=BULK_COMMAND_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, profile, schema=PROFILE_SCHEMA
+    )
 
-        payload = {
-            "email": self._username,
-            "from": "elements_android",
-            "password": self._password,
-        }
-        self._do_request("POST", URL_GSE_AUTH, json.dumps(payload))
-        self._do_request("GET", URL_GSE_API + "/v1/auth/openid/begin?op=gigaset")
 
-        return time.time()
+def setup_client(hass, account, store):
+    name = account[CONF_NAME]
 
-    def get_alarm_status(self, refresh=True):
-        if API_CALLS_ALLOWED and refresh:
-            if time.time() - self._last_authenticated > AUTH_GSE_EXPIRE:
-                self._last_authenticated = self._do_authorisation()
-            self._intrusion_data = self._do_request(
-                "GET", URL_GSE_API + "/v3/me/user/intrusion-settings"
-            )
-            self._elements_data = self._do_request(
-                "GET", URL_GSE_API + "/v2/me/elements"
-            )
-            self._health_data = self._do_request("GET", URL_GSE_API + "/v3/me/health")
-            self._event_data = self._do_request(
-                "GET", URL_GSE_API + "/v2/me/events?from_ts=" + self._last_event
-            )
-        else:
-            return self._state, self._target_state
+    transport = GigasetelementsTransport(
+        create_session(len(hass.config_entries.async_entries(DOMAIN))),
+        mode=account[CONF_TRANSPORT],
+        journal=account.get(
+            CONF_JOURNAL, hass.config.path(JOURNAL_FILE.format(slugify(name)))
+        ),
+        speed=account[CONF_REPLAY_SPEED],
+    )
 
-        self._mode_transition = self._intrusion_data["intrusion_settings"][
-            "modeTransitionInProgress"
-        ]
+    store.load()
 
-        self._state = list(DEVICE_MODE_MAP.keys())[
-            list(DEVICE_MODE_MAP.values()).index(
-                self._intrusion_data["intrusion_settings"]["active_mode"]
-            )
-        ]
+    _LOGGER.debug("Initializing %s client API for %s", DOMAIN, name)
 
-        self._target_state = list(DEVICE_MODE_MAP.keys())[
-            list(DEVICE_MODE_MAP.values()).index(
-                self._intrusion_data["intrusion_settings"]["requestedMode"]
-            )
-        ]
+    client = GigasetelementsClientAPI(
+        account[CONF_USERNAME],
+        account[CONF_PASSWORD],
+        account.get(CONF_CODE),
+        account[CONF_CODE_ARM_REQUIRED],
+        str(hass.config.time_zone),
+        account[CONF_SWITCHES],
+        account[CONF_ENABLE_DEBUG],
+        transport,
+        store,
+        snapshots=SnapshotCache(
+            hass.config.path(CAMERA_CACHE_DIR.format(slugify(name))),
+            CAMERA_CACHE_SIZE,
+        ),
+    )
+    client.api_calls_allowed = hass.state == CoreState.running
 
-        try:
-            if self._health_data["statusMsgId"] in ["alarm.user", "system_intrusion"]:
-                self._state = STATE_ALARM_TRIGGERED
-                _LOGGER.debug(
-                    "Alarm trigger state: %s", self._health_data["statusMsgId"]
-                )
-        except (KeyError, ValueError):
-            pass
+    return client
 
-        _LOGGER.debug(
-            "Alarm state: %s, target alarm state: %s", self._state, self._target_state
-        )
 
-        if self._mode_transition:
-            if self._target_state == STATE_ALARM_DISARMED:
-                return STATE_ALARM_DISARMING, self._target_state
-            return STATE_ALARM_ARMING, self._target_state
+def start_client(hass, entry, client, account, offset):
+    cancel = [
+        client.add_listener(forward_events(hass, account[CONF_NAME])),
+        track_transitions(hass, client),
+        track_removed_elements(hass, entry, client),
+        schedule_cloud_status(hass, entry, client),
+        schedule_refresh(hass, entry, client, offset),
+    ]
+    if CONF_PROXY_PORT in account:
+        stop_proxy = start_proxy(hass, client, account[CONF_PROXY_PORT])
+        if stop_proxy is not None:
+            cancel.append(stop_proxy)
 
-        return self._state, self._target_state
+    return cancel
 
-    def get_sensor_list(self, sensor_type, sensor_list):
-        sensor_id_list = []
 
-        if sensor_type == "base":
-            sensor_id_list.append(self._property_id.lower())
-        elif sensor_type == "camera":
-            try:
-                for item in self._elements_data["yc01"]:
-                    sensor_id_list.append(item["id"].lower())
-            except (KeyError, ValueError):
-                pass
-        else:
-            for sensor_code, sensor_fullname in sensor_list.items():
-                if sensor_fullname == sensor_type:
-                    for item in self._elements_data["bs01"][0]["subelements"]:
-                        if item["type"].split(".")[1] == sensor_code:
-                            sensor_id_list.append(item["id"].split(".")[1])
+def stop_client(account):
+    for cancel in account["cancel"]:
+        cancel()
+    account["client"].close()
+    account["store"].flush()
 
-        _LOGGER.debug("Get %s ids: %s", sensor_type, sensor_id_list)
+    _LOGGER.debug("Stopped %s client API for %s", DOMAIN, account["name"])
 
-        return sensor_id_list
 
-    def get_sensor_attributes(self, item, attr):
-        try:
-            attr["battery_low"] = item.get("permanentBatteryLow", None)
-            attr["battery_saver_mode"] = item.get("states", {}).get("batterySaverMode")
-            attr["battery_status"] = item.get("batteryStatus", None)
-            attr["calibration_status"] = item.get("calibrationStatus", None)
-            attr["chamber_fail"] = item.get("smokeChamberFail", None)
-            attr["connection_status"] = item.get(
-                "connectionStatus", self._elements_data["bs01"][0]["connectionStatus"]
-            )
-            attr["custom_name"] = item.get(
-                "friendlyName", self._elements_data["bs01"][0]["friendlyName"]
-            )
-            attr["duration"] = item.get("runtimeConfiguration", {}).get(
-                "durationInSeconds"
-            )
-            attr["firmware_status"] = item.get(
-                "firmwareStatus", self._elements_data["bs01"][0]["firmwareStatus"]
-            )
-            attr["humidity"] = item.get("states", {}).get("humidity")
-            attr["power_measurement"] = item.get("states", {}).get(
-                "momentaryPowerMeasurement"
-            )
-            attr["pressure"] = item.get("states", {}).get("pressure")
-            attr["setpoint"] = item.get("runtimeConfiguration", {}).get(
-                "setPoint"
-            ) or item.get("states", {}).get("setPoint")
-            attr["temperature"] = item.get("states", {}).get("temperature")
-            attr["test_required"] = item.get(
-                "testRequired", item.get("states", {}).get("testRequired")
-            )
-            attr["unmounted"] = item.get("unmounted", None)
+def forward_events(hass, name):
+    def listener(event_type, data):
+        if event_type in [EVENT_COMMAND, EVENT_GSE, EVENT_MODE_CHANGED]:
+            hass.bus.fire(event_type, {CONF_NAME: name, **data})
 
-        except (KeyError, ValueError):
-            pass
+    return listener
 
-        try:
-            attr["start_time"] = (
-                datetime.fromtimestamp(
-                    item.get("runtimeConfiguration", {}).get("startTimestampInSeconds")
-                )
-                .astimezone()
-                .isoformat()
+
+def profiled(update):
+    # entity updates are profiled along with the refresh cycles
+    @wraps(update)
+    def wrapper(self):
+        return self._client.run_profiled(update, self)
+
+    return wrapper
+
+
+def track_added_elements(hass, client, create_entities, async_add_devices):
+    @callback
+    def async_add_entities(sensor_ids):
+        entities = create_entities(sensor_ids=sensor_ids)
+        if entities:
+            async_add_devices(entities)
+
+    def listener(event_type, data):
+        if event_type == ELEMENTS_CHANGED and data["added"]:
+            hass.add_job(async_add_entities, data["added"])
+
+    return client.add_listener(listener)
+
+
+def track_removed_elements(hass, entry, client):
+    @callback
+    def async_remove_entities(sensor_ids):
+        registry = er.async_get(hass)
+        for entity in er.async_entries_for_config_entry(registry, entry.entry_id):
+            # unique ids are <property_id>.<sensor_id>[.<reading>]
+            unique_id = entity.unique_id.split(".")
+            if len(unique_id) > 1 and unique_id[1] in sensor_ids:
+                _LOGGER.info("Removing %s of retired sensor", entity.entity_id)
+                registry.async_remove(entity.entity_id)
+
+    def listener(event_type, data):
+        if event_type == ELEMENTS_CHANGED and data["removed"]:
+            hass.add_job(async_remove_entities, data["removed"])
+
+    return client.add_listener(listener)
+
+
+def track_transitions(hass, client):
+    cancel_poll = None
+
+    def poll(now):
+        nonlocal cancel_poll
+        if client.poll_transition() and cancel_poll is not None:
+            cancel_poll()
+            cancel_poll = None
+
+    def listener(event_type, data):
+        nonlocal cancel_poll
+        if event_type == TRANSITION_STARTED and cancel_poll is None:
+            cancel_poll = track_time_interval(
+                hass, poll, timedelta(seconds=ARMING_POLL_INTERVAL)
             )
-        except (KeyError, TypeError, ValueError):
-            pass
-
-        return {k: v for k, v in attr.items() if v is not None}
-
-    def get_sensor_type(self, sensor_id):
-        for basestation in self._elements_data.values():
-            for element in basestation:
-                if "subelements" in element:
-                    for subelement in element["subelements"]:
-                        if subelement["id"] == self._property_id + "." + sensor_id:
-                            return subelement["type"]
+
+    remove_listener = client.add_listener(listener)
+
+    def cancel():
+        nonlocal cancel_poll
+        remove_listener()
+        if cancel_poll is not None:
+            cancel_poll()
+            cancel_poll = None
+
+    return cancel
+
+
+def start_proxy(hass, client, port):
+    # the http server is only loaded for accounts with a proxy port
+    from .gigaset.proxy import SnapshotProxy
+
+    try:
+        proxy = SnapshotProxy(client, port)
+    except OSError as err:
+        _LOGGER.error("Unable to start proxy on port %s: %s", port, err)
         return None
 
-    def get_sensor_state(self, sensor_id, sensor_attribute):
-        sensor_attributes = {}
-        sensor_state = False
-        for item in self._elements_data["bs01"][0]["subelements"]:
-            try:
-                if item["id"] == self._property_id + "." + sensor_id:
-                    if item[sensor_attribute] in ["tilted", "open", "online"]:
-                        sensor_state = True
-                    elif item[sensor_attribute] == "closed":
-                        sensor_state = False
-                    elif not item[sensor_attribute]:
-                        sensor_state = False
-                    elif item[sensor_attribute]:
-                        sensor_state = True
-                    sensor_attributes = self.get_sensor_attributes(item, attr={})
-                    break
-            except (KeyError, ValueError):
-                pass
-
-        _LOGGER.debug("Sensor %s state: %s", sensor_id, sensor_state)
-
-        return sensor_state, sensor_attributes
-
-    def get_privacy_status(self, mode=None):
-        mode = mode or self._intrusion_data["intrusion_settings"]["active_mode"]
-
-        for item in self._intrusion_data["intrusion_settings"]["modes"]:
-            try:
-                privacy_on = item[mode]["privacy_mode"]
-            except (KeyError, ValueError):
-                pass
-
-        return STATE_ON if privacy_on else STATE_OFF
-
-    def set_privacy_status(self, mode, action):
-        payload = {"intrusion_settings": {"modes": [{mode: {"privacy_mode": action}}]}}
-        self._do_request(
-            "PUT", URL_GSE_API + "/v3/me/user/intrusion-settings", json.dumps(payload)
-        )
-        _LOGGER.info("Setting privacy mode for %s to %s", mode, action)
-
-    def get_plug_state(self, sensor_id):
-        sensor_attributes = {}
-        plug_state = STATE_UNKNOWN
-
-        for item in self._elements_data["bs01"][0]["subelements"]:
-            try:
-                if item["id"] == self._property_id + "." + sensor_id:
-                    if item["states"]["relay"] == "off":
-                        plug_state = STATE_OFF
-                    elif item["states"]["relay"] == "on":
-                        plug_state = STATE_ON
-                    else:
-                        plug_state = STATE_UNKNOWN
-                    sensor_attributes = self.get_sensor_attributes(item, attr={})
-                    break
-            except (KeyError, ValueError):
-                pass
-
-        _LOGGER.debug("Plug %s state: %s", sensor_id, plug_state)
-
-        return plug_state, sensor_attributes
-
-    def set_thermostat_setpoint(self, sensor_id, setpoint):
-        _LOGGER.info("Setting thermostat %s: %s", sensor_id, setpoint)
-
-        payload = {"setPoint": setpoint}
-        self._do_request(
-            "PUT",
-            URL_GSE_API
-            + "/v2/me/elements/bs01.ts01/"
-            + self._property_id
-            + "."
-            + sensor_id
-            + "/runtime-configuration",
-            json.dumps(payload),
-        )
+    def stop_proxy(event=None):
+        proxy.stop()
 
-    def get_climate_state(self, sensor_id, sensor_type):
-        sensor_attributes = {}
-        climate_state = STATE_UNKNOWN
-
-        for item in self._elements_data["bs01"][0]["subelements"]:
-            try:
-                if item["id"] == self._property_id + "." + sensor_id:
-                    sensor_attributes = self.get_sensor_attributes(item, attr={})
-                    climate_state = round(float(sensor_attributes["temperature"]), 1)
-                    sensor_attributes.pop("temperature")
-                    break
-            except (KeyError, ValueError):
-                pass
-
-        _LOGGER.debug(
-            "%s %s state: %s", sensor_type.capitalize(), sensor_id, climate_state
-        )
+    proxy.start()
+    remove_listener = hass.bus.listen_once(EVENT_HOMEASSISTANT_STOP, stop_proxy)
 
-        return climate_state, sensor_attributes
+    def cancel():
+        remove_listener()
+        stop_proxy()
 
-    def get_alarm_health(self):
-        sensor_attributes = {}
+    return cancel
 
-        try:
-            self._health = self._health_data.get("systemHealth", STATE_UNKNOWN)
-
-            sensor_attributes = self.get_sensor_attributes(item={}, attr={})
-            sensor_attributes["alarm_mode"] = self._state
-            sensor_attributes["today_events"] = self._dashboard_data["result"][
-                "recentEventsNumber"
-            ]
-            sensor_attributes["today_recordings"] = self._dashboard_data["result"][
-                "recentEventCounts"
-            ]["yc01.recording"]
-            sensor_attributes["privacy_mode"] = self.get_privacy_status()
-
-            for item in self._dashboard_data["result"]["recentHomecomings"]:
-                try:
-                    time_stamp = int(item["ts"]) / 1000
-                    sensor_attributes["recent_homecoming"] = str(
-                        datetime.fromtimestamp(time_stamp).astimezone().isoformat()
-                    )
-                except (KeyError, ValueError):
-                    pass
-
-            for item in self._dashboard_data["result"]["recentHomeleavings"]:
-                try:
-                    time_stamp = int(item["ts"]) / 1000
-                    sensor_attributes["recent_homeleaving"] = str(
-                        datetime.fromtimestamp(time_stamp).astimezone().isoformat()
-                    )
-                except (KeyError, ValueError):
-                    pass
-
-        except (KeyError, ValueError):
-            pass
-
-        _LOGGER.debug("Health state: %s", self._health)
-
-        return self._health, sensor_attributes
-
-    def set_alarm_status(self, action):
-        _LOGGER.info("Setting alarm panel to %s", action)
-
-        payload = {"intrusion_settings": {"active_mode": DEVICE_MODE_MAP[action]}}
-        self._do_request(
-            "PUT", URL_GSE_API + "/v3/me/user/intrusion-settings", json.dumps(payload)
-        )
 
-    def set_plug_status(self, sensor_id, action):
-        _LOGGER.info("Set plug %s: %s", sensor_id, action)
-
-        sensor_type = self.get_sensor_type(sensor_id)
-        payload = {"name": action}
-        self._do_request(
-            "POST",
-            URL_GSE_API
-            + "/v2/me/elements/"
-            + sensor_type
-            + "/"
-            + self._property_id
-            + "."
-            + sensor_id
-            + "/cmds",
-            json.dumps(payload),
-        )
+def refresh_client(hass, entry, client):
+    try:
+        client.refresh()
+    except GigasetelementsAuthError as err:
+        _LOGGER.error("%s, polling stopped until reauthenticated", err)
+        hass.add_job(entry.async_start_reauth, hass)
+        return False
 
-    def set_panic_alarm(self, action):
-        _LOGGER.info("Set panic alarm: %s", action)
+    return True
 
-        if action == STATE_ON:
-            payload = {"action": "alarm.user.start"}
-            self._do_request(
-                "POST",
-                URL_GSE_API + "/v1/me/devices/webfrontend/sink",
-                json.dumps(payload),
-            )
-        else:
-            self._do_request("DELETE", URL_GSE_API + "/v1/me/states/userAlarm")
 
-    def get_panic_alarm(self):
+def schedule_cloud_status(hass, entry, client):
+    cancel_check = None
+    stopped = False
+
+    def check(now):
+        nonlocal cancel_check
+        interval = client.get_cloud_status_interval()
         try:
-            if self._health_data["statusMsgId"] == "alarm.user":
-                panic_state = STATE_ON
-            else:
-                panic_state = STATE_OFF
-        except (KeyError, ValueError):
-            panic_state = STATE_OFF
-
-        _LOGGER.debug("Panic alarm state: %s", panic_state)
-
-        return panic_state
-
-    def get_event_detected(self, sensor_id, sensor_type_name):
-        button_press = STATE_IDLE
-        sensor_state = False
-        sensor_attributes = {}
-
-        for item in reversed(self._event_data["events"]):
-            try:
-                if (
-                    item["type"] in DEVICE_TRIGGERS
-                    and item["source_id"].lower() == sensor_id
-                ):
-                    self._last_event = str(int(item["ts"]) + 1)
-                    sensor_state = True
-                elif item["type"] in DEVICE_TRIGGERS and item["o"]["id"] == sensor_id:
-                    self._last_event = str(int(item["ts"]) + 1)
-                    sensor_state = True
-                    if item["type"] in BUTTON_PRESS_MAP:
-                        button_press = BUTTON_PRESS_MAP[item["type"]]
-            except (KeyError, ValueError):
-                pass
-
-        if len(sensor_id) == 12:
-            for item in self._elements_data["yc01"]:
-                if item["id"] == sensor_id.upper():
-                    sensor_attributes = self.get_sensor_attributes(item, attr={})
-        else:
-            for item in self._elements_data["bs01"][0]["subelements"]:
-                if item["id"] == self._property_id + "." + sensor_id:
-                    sensor_attributes = self.get_sensor_attributes(item, attr={})
-                    if sensor_type_name in BUTTON_PRESS_MAP:
-                        sensor_attributes["press"] = button_press
-
-        if API_CALLS_ALLOWED and sensor_state:
-            self._dashboard_data = self._do_request(
-                "GET",
-                URL_GSE_API + "/v1/me/events/dashboard?timezone=" + self._time_zone,
+            was_stale = client.is_stale
+            interval = client.refresh_cloud_status()
+            # catch up right away instead of waiting for the next poll
+            if was_stale and not client.is_stale:
+                refresh_client(hass, entry, client)
+        finally:
+            if not stopped:
+                cancel_check = call_later(hass, interval, check)
+
+    def cancel():
+        nonlocal stopped
+        stopped = True
+        cancel_check()
+
+    cancel_check = call_later(hass, client.get_cloud_status_interval(), check)
+
+    return cancel
+
+
+def schedule_refresh(hass, entry, client, offset):
+    cancel_refresh = None
+    stopped = False
+
+    def refresh(now):
+        if not refresh_client(hass, entry, client):
+            cancel()
+
+    def start_refresh(now):
+        nonlocal cancel_refresh
+        if not stopped:
+            cancel_refresh = track_time_interval(
+                hass, refresh, timedelta(seconds=STATE_UPDATE_INTERVAL)
             )
 
-        _LOGGER.debug("Sensor %s state: %s", sensor_id, sensor_state)
+    def cancel():
+        nonlocal stopped
+        stopped = True
+        cancel_refresh()
+
+    _LOGGER.debug("Refresh offset: %ss", round(offset, 1))
+
+    cancel_refresh = call_later(hass, offset, start_refresh)
 
-        return sensor_state, sensor_attributes
+    return cancel
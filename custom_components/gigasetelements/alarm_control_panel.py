@@ -19,9 +19,11 @@
     STATE_ON,
 )
 
-from .const import (
-    DOMAIN,
+from . import profiled
+from .const import DOMAIN
+from .gigaset.const import (
     STATE_UPDATE_INTERVAL,
+    UPDATE_ALARM,
 )
 
 SCAN_INTERVAL = timedelta(seconds=STATE_UPDATE_INTERVAL)
@@ -31,9 +33,9 @@
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
-    client = hass.data[DOMAIN]["client"]
-    name = hass.data[DOMAIN]["name"]
+async def async_setup_entry(hass, entry, async_add_devices):
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    name = hass.data[DOMAIN][entry.entry_id]["name"]
 
     async_add_devices([GigasetelementsAlarmPanel(name, client)])
 
@@ -58,6 +60,13 @@ def __init__(self, name, client):
                 " recorded"
             )
 
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._client.add_listener(self._handle_client_update))
+
+    def _handle_client_update(self, event_type, data):
+        if event_type == UPDATE_ALARM:
+            self.schedule_update_ha_state(True)
+
     @property
     def supported_features(self) -> int:
         return (
@@ -78,6 +87,12 @@ def name(self):
     def unique_id(self):
         return f"{self._property_id}"
 
+    @property
+    def extra_state_attributes(self):
+        if self._client.is_stale:
+            return {"stale": True}
+        return None
+
     @property
     def code_format(self):
         if self._code is None:
@@ -90,8 +105,9 @@ def code_format(self):
     def code_arm_required(self):
         return self._code_arm_required
 
+    @profiled
     def update(self):
-        self._state, _ = self._client.get_alarm_status()
+        self._state = self._client.get_alarm_mode()
 
     def alarm_disarm(self, code=None):
         if not self._validate_code(code, STATE_ALARM_DISARMED):
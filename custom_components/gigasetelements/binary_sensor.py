@@ -4,15 +4,19 @@
 import logging
 
 from datetime import timedelta
+from functools import partial
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 
+from . import profiled, track_added_elements
 from .const import (
-    BINARY_SENSOR_NAME,
     DEVICE_CLASS_MAP,
     DEVICE_ICON_MAP,
     DEVICE_STATUS_MAP,
     DOMAIN,
+)
+from .gigaset.const import (
+    BINARY_SENSOR_NAME,
     STATE_UPDATE_INTERVAL,
 )
 
@@ -23,26 +27,36 @@
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
-    client = hass.data[DOMAIN]["client"]
-    name = hass.data[DOMAIN]["name"]
+def create_entities(client, name, sensor_ids=None):
+    entities = []
 
     for sensor in set(BINARY_SENSOR_NAME.values()):
-        sensor_list = client.get_sensor_list(sensor, BINARY_SENSOR_NAME)
-        for sensor_id in sensor_list:
+        for sensor_id in client.get_sensor_list(sensor, BINARY_SENSOR_NAME):
+            if sensor_ids is not None and sensor_id not in sensor_ids:
+                continue
             if sensor == "camera":
-                async_add_devices(
-                    [GigasetelementsSensor(name + "_motion_" + sensor_id, client)]
+                entities.append(
+                    GigasetelementsSensor(name + "_motion_" + sensor_id, client)
                 )
             else:
-                async_add_devices(
-                    [
-                        GigasetelementsSensor(
-                            name + "_" + sensor + "_" + sensor_id, client
-                        )
-                    ]
+                entities.append(
+                    GigasetelementsSensor(name + "_" + sensor + "_" + sensor_id, client)
                 )
 
+    return entities
+
+
+async def async_setup_entry(hass, entry, async_add_devices):
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    name = hass.data[DOMAIN][entry.entry_id]["name"]
+
+    async_add_devices(create_entities(client, name))
+    entry.async_on_unload(
+        track_added_elements(
+            hass, client, partial(create_entities, client, name), async_add_devices
+        )
+    )
+
     _LOGGER.debug("Binary platform loaded")
 
 
@@ -55,7 +69,7 @@ def __init__(self, name, client):
         self._sensor_state = False
         self._sensor_attributes = {}
         self._client = client
-        self._property_id = self._client._property_id.lower()
+        self._property_id = self._client.get_property_id(self._id)
         self.update()
 
         _LOGGER.info("Initialized binary_sensor.%s", self._name)
@@ -93,6 +107,7 @@ def _set_icon(self):
         else:
             self._icon = None
 
+    @profiled
     def update(self):
         if self._type_name in [
             "button",
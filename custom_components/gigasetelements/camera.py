@@ -0,0 +1,77 @@
+"""
+Gigaset Elements platform that offers camera snapshots.
+"""
+import logging
+
+from datetime import timedelta
+from functools import partial
+
+from homeassistant.components.camera import Camera
+
+from . import profiled, track_added_elements
+from .const import DOMAIN
+from .gigaset.const import (
+    BINARY_SENSOR_NAME,
+    STATE_UPDATE_INTERVAL,
+)
+
+SCAN_INTERVAL = timedelta(seconds=STATE_UPDATE_INTERVAL)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_entities(client, name, sensor_ids=None):
+    entities = []
+
+    for camera_id in client.get_sensor_list("camera", BINARY_SENSOR_NAME):
+        if sensor_ids is None or camera_id in sensor_ids:
+            entities.append(
+                GigasetelementsCamera(name + "_camera_" + camera_id, client)
+            )
+
+    return entities
+
+
+async def async_setup_entry(hass, entry, async_add_devices):
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    name = hass.data[DOMAIN][entry.entry_id]["name"]
+
+    async_add_devices(create_entities(client, name))
+    entry.async_on_unload(
+        track_added_elements(
+            hass, client, partial(create_entities, client, name), async_add_devices
+        )
+    )
+
+    _LOGGER.debug("Camera platform loaded")
+
+
+class GigasetelementsCamera(Camera):
+    def __init__(self, name, client):
+        super().__init__()
+        self._name = name
+        self._id = name.rsplit("_", 1)[1]
+        self._client = client
+        self._property_id = self._client.get_property_id(self._id)
+        self._camera_attributes = {}
+
+        _LOGGER.info("Initialized camera.%s", self._name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def unique_id(self):
+        return f"{self._property_id}.{self._id}.camera"
+
+    @property
+    def extra_state_attributes(self):
+        return self._camera_attributes
+
+    def camera_image(self, width=None, height=None):
+        return self._client.get_camera_image(self._id)
+
+    @profiled
+    def update(self):
+        self._camera_attributes = self._client.get_camera_attributes(self._id)
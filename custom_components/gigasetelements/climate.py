@@ -4,6 +4,7 @@
 import logging
 
 from datetime import timedelta
+from functools import partial
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
@@ -13,8 +14,9 @@
 )
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 
-from .const import (
-    DOMAIN,
+from . import profiled, track_added_elements
+from .const import DOMAIN
+from .gigaset.const import (
     STATE_UPDATE_INTERVAL,
     TARGET_TEMP_HIGH,
     TARGET_TEMP_LOW,
@@ -29,20 +31,31 @@
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
-    client = hass.data[DOMAIN]["client"]
-    name = hass.data[DOMAIN]["name"]
+def create_entities(client, name, sensor_ids=None):
+    entities = []
 
     for thermostat in set(THERMOSTAT_NAME.values()):
-        thermostat_list = client.get_sensor_list(thermostat, THERMOSTAT_NAME)
-        for thermostat_id in thermostat_list:
-            async_add_devices(
-                [
+        for thermostat_id in client.get_sensor_list(thermostat, THERMOSTAT_NAME):
+            if sensor_ids is None or thermostat_id in sensor_ids:
+                entities.append(
                     GigasetelementsThermostat(
                         name + "_" + thermostat + "_" + thermostat_id, client
                     )
-                ]
-            )
+                )
+
+    return entities
+
+
+async def async_setup_entry(hass, entry, async_add_devices):
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    name = hass.data[DOMAIN][entry.entry_id]["name"]
+
+    async_add_devices(create_entities(client, name))
+    entry.async_on_unload(
+        track_added_elements(
+            hass, client, partial(create_entities, client, name), async_add_devices
+        )
+    )
 
     _LOGGER.debug("Climate platform loaded")
 
@@ -55,7 +68,7 @@ def __init__(self, name, client):
         self._type_name = name.rsplit("_", 2)[1]
         self._sensor_attributes = {}
         self._client = client
-        self._property_id = self._client._property_id.lower()
+        self._property_id = self._client.get_property_id(self._id)
         self._current_temperature = None
         self._target_temperature = None
         self._current_operation_mode = None
@@ -124,6 +137,7 @@ def set_temperature(self, **kwargs):
         temperature = kwargs.get(ATTR_TEMPERATURE)
         self._client.set_thermostat_setpoint(sensor_id=self._id, setpoint=temperature)
 
+    @profiled
     def update(self):
         (
             self._current_temperature,
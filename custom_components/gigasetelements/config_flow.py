@@ -0,0 +1,165 @@
+"""
+Gigaset Elements config flow to set up accounts from the UI or configuration.yaml.
+"""
+import logging
+
+import homeassistant.helpers.config_validation as cv
+import requests
+import voluptuous as vol
+
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import (
+    CONF_CODE,
+    CONF_NAME,
+    CONF_PASSWORD,
+    CONF_SWITCHES,
+    CONF_USERNAME,
+)
+from homeassistant.core import callback
+
+from .const import (
+    CONF_CODE_ARM_REQUIRED,
+    CONF_ENABLE_DEBUG,
+    CONF_PROXY_PORT,
+    DOMAIN,
+)
+from .gigaset.client import check_credentials
+from .gigaset.transport import GigasetelementsTransport
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def validate_credentials(username, password):
+    transport = GigasetelementsTransport(requests.Session())
+    return check_credentials(transport, username, password)
+
+
+class GigasetelementsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
+    VERSION = 1
+
+    def __init__(self):
+        self._entry = None
+
+    async def async_step_user(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            await self.async_set_unique_id(user_input[CONF_USERNAME].lower())
+            self._abort_if_unique_id_configured()
+            if self._name_in_use(user_input[CONF_NAME]):
+                errors[CONF_NAME] = "name_in_use"
+            else:
+                errors = await self._async_check_credentials(
+                    user_input[CONF_USERNAME], user_input[CONF_PASSWORD]
+                )
+            if not errors:
+                return self.async_create_entry(
+                    title=user_input[CONF_NAME], data=user_input
+                )
+
+        return self.async_show_form(
+            step_id="user",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_NAME, default="gigaset_elements"): str,
+                    vol.Required(CONF_USERNAME): str,
+                    vol.Required(CONF_PASSWORD): str,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_import(self, import_data):
+        await self.async_set_unique_id(import_data[CONF_USERNAME].lower())
+        self._abort_if_unique_id_configured(updates=import_data, reload_on_update=False)
+        if self._name_in_use(import_data[CONF_NAME]):
+            _LOGGER.error("Each %s account requires a unique name", DOMAIN)
+            return self.async_abort(reason="name_in_use")
+
+        return self.async_create_entry(title=import_data[CONF_NAME], data=import_data)
+
+    async def async_step_reauth(self, entry_data):
+        self._entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            errors = await self._async_check_credentials(
+                self._entry.data[CONF_USERNAME], user_input[CONF_PASSWORD]
+            )
+            if not errors:
+                self.hass.config_entries.async_update_entry(
+                    self._entry, data={**self._entry.data, **user_input}
+                )
+                # the update listener only reloads entries which are loaded
+                if self._entry.state is not ConfigEntryState.LOADED:
+                    await self.hass.config_entries.async_reload(self._entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_PASSWORD): str}),
+            description_placeholders={CONF_USERNAME: self._entry.data[CONF_USERNAME]},
+            errors=errors,
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return GigasetelementsOptionsFlow(config_entry)
+
+    async def _async_check_credentials(self, username, password):
+        try:
+            if not await self.hass.async_add_executor_job(
+                validate_credentials, username, password
+            ):
+                return {"base": "invalid_auth"}
+        except requests.exceptions.RequestException:
+            return {"base": "cannot_connect"}
+
+        return {}
+
+    def _name_in_use(self, name):
+        return any(
+            entry.data[CONF_NAME] == name
+            for entry in self._async_current_entries()
+            if entry.unique_id != self.unique_id
+        )
+
+
+class GigasetelementsOptionsFlow(config_entries.OptionsFlow):
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        account = {**self._entry.data, **self._entry.options}
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_SWITCHES, default=account.get(CONF_SWITCHES, True)
+                    ): bool,
+                    vol.Optional(
+                        CONF_CODE_ARM_REQUIRED,
+                        default=account.get(CONF_CODE_ARM_REQUIRED, True),
+                    ): bool,
+                    vol.Optional(
+                        CONF_CODE,
+                        description={"suggested_value": account.get(CONF_CODE)},
+                    ): str,
+                    vol.Optional(
+                        CONF_ENABLE_DEBUG, default=account.get(CONF_ENABLE_DEBUG, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_PROXY_PORT,
+                        description={"suggested_value": account.get(CONF_PROXY_PORT)},
+                    ): cv.port,
+                }
+            ),
+        )
@@ -1,51 +1,33 @@
 """Constants used by Gigaset Elements custom component."""
 
-from homeassistant.components.binary_sensor import BinarySensorDeviceClass
-from homeassistant.components.sensor import SensorDeviceClass
-from homeassistant.components.switch import SwitchDeviceClass
-
-API_CALLS_ALLOWED = False
-
-AUTH_GSE_EXPIRE = 14400
-
-BINARY_SENSOR_NAME = {
-    "bn01": "button",
-    "ds01": "door",
-    "ds02": "door",
-    "is01": "siren",
-    "ps01": "motion",
-    "ps02": "motion",
-    "sd01": "smoke",
-    "um01": "universal",
-    "wd01": "water",
-    "ws02": "window",
-    "yc01": "camera",
-}
+ATTR_COMMANDS = "commands"
+ATTR_COUNT = "count"
+ATTR_CYCLES = "cycles"
+ATTR_SENSOR_ID = "sensor_id"
 
-BUTTON_PRESS_MAP = {
-    "button": "idle",
-    "button1": "short",
-    "button2": "double",
-    "button3": "long",
-    "button4": "very_long",
-}
+CAMERA_CACHE_DIR = "gigasetelements_{}_snapshots"
+CAMERA_CACHE_SIZE = 50 * 1024 * 1024
 
 CONF_CODE_ARM_REQUIRED = "code_arm_required"
 CONF_ENABLE_DEBUG = "enable_debug"
+CONF_JOURNAL = "journal"
+CONF_PROXY_PORT = "proxy_port"
+CONF_REPLAY_SPEED = "replay_speed"
+CONF_TRANSPORT = "transport"
 
 DEVICE_CLASS_MAP = {
     "base": None,
-    "button": BinarySensorDeviceClass.MOTION,
-    "climate": SensorDeviceClass.TEMPERATURE,
-    "door": BinarySensorDeviceClass.DOOR,
-    "motion": BinarySensorDeviceClass.MOTION,
-    "plug": SwitchDeviceClass.OUTLET,
+    "button": "motion",
+    "climate": "temperature",
+    "door": "door",
+    "motion": "motion",
+    "plug": "outlet",
     "siren": None,
-    "smoke": BinarySensorDeviceClass.SMOKE,
-    "thermostat": SensorDeviceClass.TEMPERATURE,
-    "universal": BinarySensorDeviceClass.DOOR,
-    "water": BinarySensorDeviceClass.MOISTURE,
-    "window": BinarySensorDeviceClass.WINDOW,
+    "smoke": "smoke",
+    "thermostat": "temperature",
+    "universal": "door",
+    "water": "moisture",
+    "window": "window",
 }
 
 DEVICE_ICON_MAP = {
@@ -69,13 +51,6 @@
     "triggered": "mdi:shield-alert",
 }
 
-DEVICE_MODE_MAP = {
-    "armed_away": "away",
-    "armed_home": "custom",
-    "armed_night": "night",
-    "disarmed": "home",
-}
-
 DEVICE_NO_BATTERY = ["bs01", "is01", "sp01", "sp02", "yc01"]
 
 DEVICE_STATUS_MAP = {
@@ -85,21 +60,6 @@
     "window": "positionStatus",
 }
 
-DEVICE_TRIGGERS = [
-    "button1",
-    "button2",
-    "button3",
-    "button4",
-    "movement",
-    "open",
-    "sirenon",
-    "smoke_detected",
-    "test",
-    "tilt",
-    "water_detected",
-    "yc01.motion",
-]
-
 DEVICE_UOM_MAP = {
     "climate": "°C",
     "thermostat": "°C",
@@ -107,32 +67,41 @@
 
 DOMAIN = "gigasetelements"
 
-HEADER_GSE = {
-    "content-type": "application/json; charset=UTF-8",
-    "user-agent": "AppGigasetElements-Android/9.10.8 (23103115)",
+ISSUE_URL = "https://github.com/dynasticorpheus/gigasetelements-ha/issues"
+
+JOURNAL_FILE = "gigasetelements_{}.jsonl.gz"
+
+MEASUREMENT_CLASS_MAP = {
+    "humidity": "humidity",
+    "power": "power",
+    "pressure": "pressure",
+    "temperature": "temperature",
 }
 
-ISSUE_URL = "https://github.com/dynasticorpheus/gigasetelements-ha/issues"
+MEASUREMENT_UOM_MAP = {
+    "humidity": "%",
+    "power": "W",
+    "pressure": "hPa",
+    "temperature": "°C",
+}
+
+PROFILE_FILE = "gigasetelements_profile_{}_{}"
 
 PLATFORMS = [
     "alarm_control_panel",
     "binary_sensor",
+    "camera",
     "climate",
     "sensor",
     "switch",
 ]
 
-SENSOR_NAME = {
-    "bs01": "base",
-    "cl01": "climate",
-}
+SERVICE_BULK_COMMAND = "bulk_command"
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_PROFILE = "profile"
 
-STATE_UPDATE_INTERVAL = 10
-
-SWITCH_NAME = {
-    "sp01": "plug",
-    "sp02": "plug",
-}
+STORAGE_SAVE_DELAY = 30
+STORAGE_VERSION = 1
 
 SWITCH_TYPE = {
     "away_mode": "armed_away",
@@ -144,18 +113,6 @@
     "privacy_night": "armed_night",
 }
 
-TARGET_TEMP_HIGH = 30.0
-TARGET_TEMP_LOW = 5.0
-TARGET_TEMP_STEP = 0.5
-
-THERMOSTAT_NAME = {
-    "ts01": "thermostat",
-}
-
-URL_GSE_API = "https://api.gigaset-elements.de/api"
-URL_GSE_AUTH = "https://im.gigaset-elements.de/identity/api/v2/user/login"
-URL_GSE_CLOUD = "https://status.gigaset-elements.de/api/v1/status"
-
 VERSION = "2023.12.2"
 
 STARTUP = """
@@ -0,0 +1,21 @@
+"""
+Gigaset Elements diagnostics support.
+"""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_CODE, CONF_PASSWORD, CONF_USERNAME
+
+from .const import DOMAIN
+
+TO_REDACT = {CONF_CODE, CONF_PASSWORD, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+
+    return async_redact_data(
+        {
+            "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+            "client": await hass.async_add_executor_job(client.get_diagnostics),
+        },
+        TO_REDACT,
+    )
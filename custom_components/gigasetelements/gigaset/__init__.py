@@ -0,0 +1,3 @@
+"""
+Gigaset Elements client core, independent of Home Assistant.
+"""
@@ -0,0 +1,207 @@
+"""
+Gigaset Elements command line client to poll, stream events and load test.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import requests
+
+from .client import GigasetelementsClientAPI
+from .const import (
+    EVENT_GSE,
+    PROXY_HOST,
+    STATE_UPDATE_INTERVAL,
+    TRANSPORT_LIVE,
+    TRANSPORT_MODES,
+)
+from .latency import LatencyWindow
+from .proxy import SnapshotProxy
+from .transport import GigasetelementsTransport, create_session
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_client(args):
+    transport = GigasetelementsTransport(
+        create_session(getattr(args, "clients", 1)),
+        mode=args.transport,
+        journal=args.journal,
+        speed=args.replay_speed,
+    )
+
+    return GigasetelementsClientAPI(
+        args.username,
+        args.password,
+        None,
+        False,
+        args.time_zone,
+        True,
+        args.debug,
+        transport,
+        base_url=args.base_url,
+    )
+
+
+def iter_cycles(cycles):
+    return itertools.count() if cycles == 0 else range(cycles)
+
+
+def output(data):
+    print(json.dumps(data, default=str), flush=True)
+
+
+def add_counters(totals, counters):
+    for name, values in counters.items():
+        total = totals.setdefault(name, dict.fromkeys(values, 0))
+        for key, value in values.items():
+            total[key] += value
+
+
+def poll(args):
+    client = create_client(args)
+
+    for cycle in iter_cycles(args.cycles):
+        if cycle:
+            time.sleep(args.interval)
+        start = time.monotonic()
+        client.refresh()
+        state, target = client.get_alarm_status(refresh=False)
+        output(
+            {
+                "cycle": cycle + 1,
+                "duration": round(time.monotonic() - start, 3),
+                "state": state,
+                "target": target,
+                "health": client.get_alarm_health()[0],
+                "sensors": len(client.get_measurement_list()),
+            }
+        )
+
+
+def events(args):
+    client = create_client(args)
+
+    def listener(event_type, data):
+        if event_type == EVENT_GSE:
+            output(data)
+
+    client.add_listener(listener)
+
+    for cycle in iter_cycles(args.cycles):
+        if cycle:
+            time.sleep(args.interval)
+        client.refresh()
+
+
+def proxy(args):
+    client = create_client(args)
+    server = SnapshotProxy(client, args.port, args.host)
+    server.start()
+
+    try:
+        for cycle in iter_cycles(args.cycles):
+            if cycle:
+                time.sleep(args.interval)
+            client.refresh()
+    finally:
+        server.stop()
+
+
+def load(args):
+    durations = LatencyWindow(args.clients * args.cycles)
+    bandwidth = {}
+    connections = {}
+    errors = []
+    lock = threading.Lock()
+
+    def run():
+        try:
+            client = create_client(args)
+            for cycle in range(args.cycles):
+                if cycle:
+                    time.sleep(args.interval)
+                start = time.monotonic()
+                client.refresh()
+                with lock:
+                    durations.add(time.monotonic() - start)
+            with lock:
+                add_counters(bandwidth, client.get_bandwidth())
+                # the pool is shared, its counters already cover all clients
+                connections.update(client.get_connections())
+        except (KeyError, ValueError, requests.exceptions.RequestException) as err:
+            with lock:
+                errors.append(str(err))
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=run) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    output(
+        {
+            "clients": args.clients,
+            "cycles": args.cycles,
+            "elapsed": round(elapsed, 3),
+            "refresh": durations.summary(),
+            "bandwidth": bandwidth,
+            "connections": connections,
+            "errors": len(errors),
+        }
+    )
+    for error in errors[:10]:
+        _LOGGER.error("Client failed: %s", error)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="gigaset", description=__doc__.strip())
+    parser.add_argument("--username", default=os.environ.get("GSE_USERNAME", ""))
+    parser.add_argument("--password", default=os.environ.get("GSE_PASSWORD", ""))
+    parser.add_argument("--base-url", help="override the Gigaset Elements hosts")
+    parser.add_argument("--time-zone", default="UTC")
+    parser.add_argument("--transport", choices=TRANSPORT_MODES, default=TRANSPORT_LIVE)
+    parser.add_argument("--journal")
+    parser.add_argument("--replay-speed", type=float, default=1.0)
+    parser.add_argument("--interval", type=float, default=STATE_UPDATE_INTERVAL)
+    parser.add_argument(
+        "--cycles", type=int, default=1, help="0 polls until interrupted"
+    )
+    parser.add_argument("--debug", action="store_true")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("poll", help="refresh and print the alarm state")
+    commands.add_parser("events", help="stream events as JSON lines")
+    load_parser = commands.add_parser("load", help="run concurrent clients")
+    load_parser.add_argument("--clients", type=int, default=10)
+    proxy_parser = commands.add_parser("proxy", help="poll and serve the snapshot")
+    proxy_parser.add_argument("--host", default=PROXY_HOST)
+    proxy_parser.add_argument("--port", type=int, default=8080)
+
+    args = parser.parse_args(argv)
+    if args.command == "load" and args.cycles < 1:
+        parser.error("load requires at least one cycle")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    try:
+        handlers = {"poll": poll, "events": events, "load": load, "proxy": proxy}
+        handlers[args.command](args)
+    except KeyboardInterrupt:
+        return 130
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1426 @@
+"""
+Gigaset Elements client API for the alarm system, sensors and devices.
+"""
+import json
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+from .const import (
+    API_RATE_BURST,
+    API_RATE_LIMIT,
+    ARMING_POLL_TIMEOUT,
+    ATTR_COMMAND,
+    ATTR_TARGET,
+    ATTR_VALUE,
+    AUTH_GSE_EXPIRE,
+    BINARY_SENSOR_NAME,
+    BULK_COMMANDS,
+    BULK_MAX_CONCURRENCY,
+    BUTTON_PRESS_MAP,
+    CAMERA_CHUNK_SIZE,
+    CAMERA_MOTION,
+    CAMERA_SNAPSHOT_MAX_AGE,
+    CLOUD_STATUS_INTERVAL,
+    CLOUD_STATUS_MAINTENANCE_INTERVAL,
+    COMMAND_EXPIRED,
+    COMMAND_FAILED,
+    COMMAND_MAX_AGE,
+    COMMAND_QUEUED,
+    COMMAND_SUCCESS,
+    COMMAND_SUPERSEDED,
+    DEVICE_MODE_MAP,
+    DEVICE_TRIGGERS,
+    ELEMENTS_CHANGED,
+    ELEMENTS_REMOVE_AFTER,
+    ENERGY_MAX_GAP,
+    ENERGY_ROLLUP_SIZE,
+    ENERGY_ROLLUP_WINDOW,
+    ENERGY_SAVE_INTERVAL,
+    EVENT_BACKFILL_MAX_PAGES,
+    EVENT_COMMAND,
+    EVENT_DEDUPE_SIZE,
+    EVENT_GSE,
+    EVENT_HISTORY_SIZE,
+    EVENT_MODE_CHANGED,
+    EVENT_PAGE_SIZE,
+    HEADER_GSE,
+    LATENCY_MAX_DELAY,
+    LATENCY_WINDOW,
+    MEASUREMENT_NAME,
+    MEASUREMENT_STATE_MAP,
+    STATE_ALARM_ARMING,
+    STATE_ALARM_DISARMED,
+    STATE_ALARM_DISARMING,
+    STATE_ALARM_TRIGGERED,
+    STATE_IDLE,
+    STATE_OFF,
+    STATE_ON,
+    STATE_UNKNOWN,
+    SWITCH_NAME,
+    TRACE_PAYLOAD_SIZE,
+    TRACE_SIZE,
+    TRANSITION_STARTED,
+    UPDATE_ALARM,
+    URL_GSE_API,
+    URL_GSE_AUTH,
+    URL_GSE_CLOUD,
+)
+from .commands import CommandQueue, command_key
+from .energy import EnergyAccumulator, PowerRollup
+from .events import EventDeduplicator, event_payload
+from .health import HealthIndex
+from .history import EventHistory
+from .latency import LatencyTracker
+from .trace import TraceBuffer
+from .transport import RateLimiter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GigasetelementsAuthError(Exception):
+    pass
+
+
+def rebase_url(url, base_url):
+    if not base_url:
+        return url
+    return base_url.rstrip("/") + urlparse(url).path
+
+
+def auth_payload(username, password):
+    return json.dumps(
+        {
+            "email": username,
+            "from": "elements_android",
+            "password": password,
+        }
+    )
+
+
+def check_credentials(transport, username, password, base_url=None):
+    response = transport.request(
+        "POST",
+        rebase_url(URL_GSE_AUTH, base_url),
+        auth_payload(username, password),
+        headers=HEADER_GSE,
+    )
+
+    return response.ok
+
+
+class GigasetelementsClientAPI:
+    def __init__(
+        self,
+        username,
+        password,
+        code,
+        code_arm_required,
+        time_zone,
+        alarm_switch,
+        enable_debug,
+        transport,
+        store=None,
+        base_url=None,
+        snapshots=None,
+    ):
+        self._username = username
+        self._password = password
+        self._time_zone = time_zone
+        self._alarm_switch = alarm_switch
+        self._code = code
+        self._code_arm_required = code_arm_required
+        self._enable_debug = enable_debug
+        self._trace = TraceBuffer(TRACE_SIZE, TRACE_PAYLOAD_SIZE if enable_debug else 0)
+        self._transport = transport
+        self._store = store
+        self._url_api = rebase_url(URL_GSE_API, base_url)
+        self._url_auth = rebase_url(URL_GSE_AUTH, base_url)
+        self._url_cloud = rebase_url(URL_GSE_CLOUD, base_url)
+        self.api_calls_allowed = True
+        self._mode_transition = False
+        self._transition_started = None
+        self._transition_target = None
+        self._transition_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._rate_limiter = RateLimiter(API_RATE_LIMIT, API_RATE_BURST)
+        self._target_state = STATE_ALARM_DISARMED
+        self._state = STATE_ALARM_DISARMED
+        self._health = STATE_UNKNOWN
+        self._last_event = (
+            self._store.get("event_cursor") if self._store else None
+        ) or str(int(time.time()) * 1000)
+        self._event_filter = EventDeduplicator(
+            EVENT_DEDUPE_SIZE, self._store.get("event_ids") if self._store else None
+        )
+        self._commands = CommandQueue(
+            self._store.get("command_queue") if self._store else None
+        )
+        self._replay_lock = threading.Lock()
+        self._listeners = []
+        self._history = EventHistory(
+            EVENT_HISTORY_SIZE, self._store.get("history") if self._store else None
+        )
+        self._energy = {
+            sensor_id: EnergyAccumulator(ENERGY_MAX_GAP, **accumulator)
+            for sensor_id, accumulator in (
+                self._store.get("energy", {}) if self._store else {}
+            ).items()
+        }
+        self._energy_saved = time.time()
+        self._power_rollup = {}
+        self._latency = LatencyTracker(LATENCY_WINDOW)
+        self._profiler = None
+        self._snapshots = snapshots
+        self._snapshot_lock = threading.Lock()
+        self._latest_snapshot = {}
+        self._prefetch = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="gigaset_snapshot"
+        )
+        self._detected = {}
+        self._unshown = {}
+        self._validators = {}
+        self._transport.warm([self._url_cloud, self._url_auth, self._url_api])
+        self._cloud = self._do_request("GET", self._url_cloud).json()
+        self._maintenance = bool(self._cloud.get("isMaintenance"))
+        self._last_authenticated = self._restore_session()
+        self._elements_data = None
+        if self._last_authenticated is not None:
+            self._elements_data = self._do_request(
+                "GET", self._url_api + "/v2/me/elements", conditional=True
+            )
+        if (
+            not isinstance(self._elements_data, dict)
+            or "bs01" not in self._elements_data
+        ):
+            self._last_authenticated = self._do_authorisation()
+            self._elements_data = self._do_request(
+                "GET", self._url_api + "/v2/me/elements", conditional=True
+            )
+        self._basestations = {}
+        self._subelements = {}
+        self._cameras = set()
+        self._missing = {}
+        self._health_index = HealthIndex()
+        self._update_elements()
+        self._property_id = self._elements_data["bs01"][0]["id"]
+        self._intrusion_data = self._do_request(
+            "GET", self._url_api + "/v3/me/user/intrusion-settings", conditional=True
+        )
+        self._health_data = self._do_request(
+            "GET", self._url_api + "/v3/me/health", conditional=True
+        )
+        self._dashboard_data = self._do_request(
+            "GET", self._url_api + "/v1/me/events/dashboard?timezone=" + self._time_zone
+        )
+
+        _LOGGER.debug("Property ids: %s", list(self._basestations))
+
+    def _do_request(self, request_type, url, payload="", parse=True, conditional=False):
+        headers = HEADER_GSE
+        validators, cached = self._validators.get(url, (None, None))
+        if conditional and validators:
+            headers = {**HEADER_GSE, **validators}
+
+        start = time.monotonic()
+        response = self._transport.request(request_type, url, payload, headers=headers)
+        duration = round(time.monotonic() - start, 3)
+
+        # an unchanged payload is served from the last response without parsing
+        if conditional and validators and response.status_code == 304:
+            self._trace_request(request_type, url, response, duration)
+            return cached
+
+        if not response.ok:
+            _LOGGER.error(
+                "API request: [%s] %s %s",
+                response.status_code,
+                response.reason,
+                urlparse(url).path,
+            )
+
+        if not parse:
+            self._trace_request(request_type, url, response, duration)
+            return response
+
+        if response.headers.get("content-type", "").startswith("application/json"):
+            data = response.json()
+            self._trace_request(request_type, url, response, duration, data)
+            if conditional and response.ok:
+                self._save_validators(url, response, data)
+            return data
+
+        self._trace_request(request_type, url, response, duration, response.text)
+        return response
+
+    def _save_validators(self, url, response, data):
+        validators = {}
+        if response.headers.get("etag"):
+            validators["if-none-match"] = response.headers["etag"]
+        if response.headers.get("last-modified"):
+            validators["if-modified-since"] = response.headers["last-modified"]
+
+        if validators:
+            self._validators[url] = (validators, data)
+        else:
+            self._validators.pop(url, None)
+
+    def _trace_request(self, request_type, url, response, duration, payload=None):
+        self._trace.record(
+            "request",
+            payload,
+            method=request_type,
+            path=urlparse(url).path,
+            status=response.status_code,
+            duration=duration,
+        )
+
+    def _do_authorisation(self):
+        if self._cloud["isMaintenance"]:
+            _LOGGER.error("API maintenance: %s", self._cloud["isMaintenance"])
+        _LOGGER.info("Authenticating")
+
+        response = self._do_request(
+            "POST",
+            self._url_auth,
+            auth_payload(self._username, self._password),
+            parse=False,
+        )
+        if response.status_code in [401, 403]:
+            raise GigasetelementsAuthError(
+                "Authentication failed: [%s] %s"
+                % (response.status_code, response.reason)
+            )
+        self._do_request("GET", self._url_api + "/v1/auth/openid/begin?op=gigaset")
+
+        authenticated = time.time()
+        if self._store:
+            self._store.save(
+                "session",
+                {
+                    "authenticated": authenticated,
+                    "cookies": self._transport.get_cookies(),
+                },
+            )
+
+        return authenticated
+
+    def _restore_session(self):
+        session = self._store.get("session") if self._store else None
+        if not session or time.time() - session["authenticated"] > AUTH_GSE_EXPIRE:
+            return None
+
+        self._transport.set_cookies(session["cookies"])
+        _LOGGER.info("Reusing session authenticated at %s", session["authenticated"])
+
+        return session["authenticated"]
+
+    def _update_elements(self):
+        basestations = {}
+        subelements = {}
+
+        for basestation in self._elements_data.get("bs01", []):
+            basestations[basestation["id"].lower()] = basestation
+            for item in basestation.get("subelements", []):
+                subelements[item["id"].split(".")[1]] = (basestation, item)
+        cameras = {item["id"].lower() for item in self._elements_data.get("yc01", [])}
+
+        added = set()
+        if self._basestations:
+            added = self._diff_elements(subelements, cameras)
+
+        self._basestations = basestations
+        self._subelements = subelements
+        self._cameras = cameras
+        self._health_index.update(
+            {
+                **basestations,
+                **{sensor_id: item for sensor_id, (_, item) in subelements.items()},
+            }
+        )
+
+        # listeners look the new elements up, so they are told once indexed
+        if added:
+            _LOGGER.info("Elements added: %s", added)
+            self._notify(ELEMENTS_CHANGED, {"added": sorted(added), "removed": []})
+
+    def _diff_elements(self, subelements, cameras):
+        present = set(subelements) | cameras
+        # elements that come back while pending removal still have entities
+        added = present - set(self._subelements) - self._cameras - set(self._missing)
+
+        for element_id in present & set(self._missing):
+            del self._missing[element_id]
+        for sensor_id, (basestation, _) in self._subelements.items():
+            if sensor_id not in subelements:
+                self._missing[sensor_id] = (basestation["id"].lower(), 0)
+        for camera_id in self._cameras - cameras:
+            self._missing[camera_id] = (None, 0)
+
+        return added
+
+    def _retire_elements(self):
+        removed = []
+
+        for element_id, (basestation_id, count) in list(self._missing.items()):
+            # only a response listing the sensors of the base station counts, so
+            # a base station reported without subelements retires nothing
+            if basestation_id is None:
+                listed = "yc01" in self._elements_data
+            else:
+                listed = "subelements" in self._basestations.get(basestation_id, {})
+            if not listed:
+                continue
+            if count + 1 < ELEMENTS_REMOVE_AFTER:
+                self._missing[element_id] = (basestation_id, count + 1)
+                continue
+            del self._missing[element_id]
+            removed.append(element_id)
+
+        if removed:
+            _LOGGER.info("Elements removed: %s", removed)
+            self._notify(ELEMENTS_CHANGED, {"added": [], "removed": sorted(removed)})
+
+    def _update_energy(self):
+        timestamp = time.time()
+
+        for sensor_id, (_, item) in self._subelements.items():
+            if item["type"].split(".")[1] not in SWITCH_NAME:
+                continue
+            power = self.get_measurement(sensor_id, "power")
+            if power is None:
+                continue
+            if sensor_id not in self._energy:
+                self._energy[sensor_id] = EnergyAccumulator(ENERGY_MAX_GAP)
+            if sensor_id not in self._power_rollup:
+                self._power_rollup[sensor_id] = PowerRollup(
+                    ENERGY_ROLLUP_WINDOW, ENERGY_ROLLUP_SIZE
+                )
+            self._energy[sensor_id].add(timestamp, power)
+            self._power_rollup[sensor_id].add(timestamp, power)
+
+        # totals only move slowly, a few minutes lost on a crash are acceptable
+        if timestamp - self._energy_saved >= ENERGY_SAVE_INTERVAL:
+            self._save_energy()
+
+    def _save_energy(self):
+        self._energy_saved = time.time()
+        if self._store and self._energy:
+            self._store.save(
+                "energy",
+                {
+                    sensor_id: accumulator.to_dict()
+                    for sensor_id, accumulator in self._energy.items()
+                },
+            )
+
+    def _get_basestation(self, sensor_id=None):
+        if sensor_id in self._subelements:
+            return self._subelements[sensor_id][0]
+        return self._basestations.get(
+            sensor_id, self._basestations.get(self._property_id.lower())
+        )
+
+    def get_property_id(self, sensor_id=None):
+        basestation = self._get_basestation(sensor_id)
+        if basestation is None:
+            return self._property_id.lower()
+        return basestation["id"].lower()
+
+    @property
+    def is_stale(self):
+        return self._maintenance
+
+    def refresh_cloud_status(self):
+        # only data polling pauses, the status is checked often during
+        # maintenance so polling resumes as soon as it ends
+        try:
+            self._cloud = self._do_request("GET", self._url_cloud).json()
+        except (AttributeError, ValueError, requests.exceptions.RequestException):
+            return self.get_cloud_status_interval()
+
+        maintenance = bool(self._cloud.get("isMaintenance"))
+
+        if maintenance and not self._maintenance:
+            _LOGGER.warning("API maintenance started, polling paused")
+        elif self._maintenance and not maintenance:
+            _LOGGER.warning("API maintenance ended, polling resumed")
+
+        self._maintenance = maintenance
+
+        return self.get_cloud_status_interval()
+
+    def get_cloud_status_interval(self):
+        if self._maintenance:
+            return CLOUD_STATUS_MAINTENANCE_INTERVAL
+        return CLOUD_STATUS_INTERVAL
+
+    def start_profiling(self, cycles, path):
+        if self._profiler is not None:
+            _LOGGER.warning("Profiling already in progress")
+            return
+
+        # cProfile and tracemalloc are only loaded when profiling is requested
+        from .profiler import CycleProfiler
+
+        self._profiler = CycleProfiler(cycles, path)
+
+    def run_profiled(self, func, *args):
+        profiler = self._profiler
+        if profiler is None:
+            return func(*args)
+
+        return profiler.measure(func, *args)
+
+    def refresh(self):
+        if not self.api_calls_allowed or self._maintenance:
+            return
+        # a refresh stuck in retries must not pile up threads or ingest twice
+        if not self._refresh_lock.acquire(blocking=False):
+            _LOGGER.debug("Previous refresh still running, skipped")
+            return
+
+        try:
+            if self._profiler is None:
+                self._refresh()
+            elif self._profiler.run(self._refresh):
+                profiler, self._profiler = self._profiler, None
+                profiler.write()
+
+            if len(self._commands):
+                self._replay_commands()
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self):
+        if time.time() - self._last_authenticated > AUTH_GSE_EXPIRE:
+            self._last_authenticated = self._do_authorisation()
+
+        started = time.perf_counter()
+        self._intrusion_data = self._do_request(
+            "GET", self._url_api + "/v3/me/user/intrusion-settings", conditional=True
+        )
+        elements_data = self._do_request(
+            "GET", self._url_api + "/v2/me/elements", conditional=True
+        )
+        self._health_data = self._do_request(
+            "GET", self._url_api + "/v3/me/health", conditional=True
+        )
+        fetch_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if elements_data is not self._elements_data:
+            self._elements_data = elements_data
+            self._update_elements()
+        self._retire_elements()
+        self._update_energy()
+        self._update_alarm_state()
+        self._latency.add_phase("parse", time.perf_counter() - started)
+
+        event_fetch_time, dispatch_time = self._ingest_events()
+        self._latency.add_phase("fetch", fetch_time + event_fetch_time)
+        self._latency.add_phase("dispatch", dispatch_time)
+
+        if self._mode_transition and self._transition_started is None:
+            self._start_transition()
+
+    def _update_alarm_state(self):
+        self._mode_transition = self._intrusion_data["intrusion_settings"][
+            "modeTransitionInProgress"
+        ]
+
+        self._state = list(DEVICE_MODE_MAP.keys())[
+            list(DEVICE_MODE_MAP.values()).index(
+                self._intrusion_data["intrusion_settings"]["active_mode"]
+            )
+        ]
+
+        self._target_state = list(DEVICE_MODE_MAP.keys())[
+            list(DEVICE_MODE_MAP.values()).index(
+                self._intrusion_data["intrusion_settings"]["requestedMode"]
+            )
+        ]
+
+        try:
+            if self._health_data["statusMsgId"] in ["alarm.user", "system_intrusion"]:
+                self._state = STATE_ALARM_TRIGGERED
+                _LOGGER.debug(
+                    "Alarm trigger state: %s", self._health_data["statusMsgId"]
+                )
+        except (KeyError, ValueError):
+            pass
+
+        self._trace.record(
+            "alarm_state",
+            state=self._state,
+            target=self._target_state,
+            status=self._health_data.get("statusMsgId"),
+        )
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+        def remove_listener():
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    def _notify(self, event_type, data):
+        for listener in list(self._listeners):
+            try:
+                listener(event_type, data)
+            except Exception:
+                _LOGGER.exception("Error in %s listener", event_type)
+
+    def _get_events(self, from_ts, to_ts=None):
+        url = (
+            self._url_api
+            + "/v2/me/events?limit="
+            + str(EVENT_PAGE_SIZE)
+            + "&from_ts="
+            + str(from_ts)
+        )
+        if to_ts is not None:
+            url += "&to_ts=" + str(to_ts)
+
+        response = self._do_request("GET", url)
+        try:
+            return response["events"]
+        except (KeyError, TypeError):
+            return []
+
+    def _iter_event_pages(self):
+        # pages are returned newest first, walk backwards keeping only the page
+        # boundaries and fetch the windows again oldest first
+        page = self._get_events(self._last_event)
+        if len(page) < EVENT_PAGE_SIZE:
+            yield reversed(page)
+            return
+
+        newest = int(page[0]["ts"])
+        boundaries = [int(page[-1]["ts"])]
+        del page
+
+        while True:
+            if len(boundaries) > EVENT_BACKFILL_MAX_PAGES:
+                _LOGGER.warning(
+                    "Event backlog exceeds %s pages, skipping events before %s",
+                    EVENT_BACKFILL_MAX_PAGES,
+                    boundaries[-1],
+                )
+                boundaries.pop()
+                break
+            page = self._get_events(self._last_event, boundaries[-1])
+            if len(page) < EVENT_PAGE_SIZE:
+                yield reversed(page)
+                break
+            boundaries.append(min(int(page[-1]["ts"]), boundaries[-1] - 1))
+            del page
+
+        _LOGGER.info("Backfilling %s event pages", len(boundaries))
+
+        upper = [newest] + boundaries[:-1]
+        for from_ts, to_ts in reversed(list(zip(boundaries, upper))):
+            yield reversed(self._get_events(from_ts, to_ts))
+
+    def _ingest_events(self):
+        cursor = self._last_event
+        self._detected = {}
+        self._expire_unshown()
+        fetch_time = dispatch_time = 0
+
+        started = time.perf_counter()
+        for page in self._iter_event_pages():
+            fetched = time.perf_counter()
+            fetch_time += fetched - started
+            for event in page:
+                self._dispatch_event(event)
+            started = time.perf_counter()
+            dispatch_time += started - fetched
+
+        if self._detected:
+            started = time.perf_counter()
+            self._dashboard_data = self._do_request(
+                "GET",
+                self._url_api + "/v1/me/events/dashboard?timezone=" + self._time_zone,
+            )
+            fetch_time += time.perf_counter() - started
+
+        if self._store and self._last_event != cursor:
+            self._store.save("event_cursor", self._last_event)
+            self._store.save("event_ids", self._event_filter.to_list())
+            self._store.save("history", self._history.to_dict())
+
+        return fetch_time, dispatch_time
+
+    def _expire_unshown(self):
+        # detections no entity picked up are the slowest, not left out
+        now = time.time()
+        for event_id, (sensor_type, timestamp) in list(self._unshown.items()):
+            delay = now - timestamp / 1000
+            if delay >= LATENCY_MAX_DELAY and self._unshown.pop(event_id, None):
+                self._latency.add_event(sensor_type, delay)
+
+    def _dispatch_event(self, event):
+        try:
+            if self._event_filter.seen(event["id"]):
+                return
+            self._last_event = str(max(int(self._last_event), int(event["ts"]) + 1))
+        except (KeyError, TypeError, ValueError):
+            return
+
+        payload = event_payload(event)
+        self._history.add(
+            payload.get("sensor_id", payload["source_id"]),
+            payload["event_id"],
+            payload["event_type"],
+            payload["timestamp"],
+        )
+        delay = time.time() - payload["timestamp"] / 1000
+        # events fetched late, after a restart or outage, must not be taken
+        # for something happening right now
+        payload["backfill"] = delay > LATENCY_MAX_DELAY
+        self._notify(EVENT_GSE, payload)
+        if (
+            self._snapshots is not None
+            and payload["event_type"] == CAMERA_MOTION
+            and delay <= CAMERA_SNAPSHOT_MAX_AGE
+        ):
+            self._prefetch.submit(
+                self.prefetch_snapshot, payload["source_id"], payload["event_id"]
+            )
+
+        # events older than LATENCY_MAX_DELAY are backfill and not measured
+        if delay <= LATENCY_MAX_DELAY:
+            if "sensor_type" in payload:
+                sensor_code = payload["sensor_type"].split(".")[-1]
+            else:
+                sensor_code = payload["event_type"].split(".")[0]
+            sensor_type = BINARY_SENSOR_NAME.get(sensor_code, "other")
+            # detections are measured once an entity shows them, other events
+            # are only shown on the event bus fired above
+            if event.get("type") in DEVICE_TRIGGERS:
+                self._unshown[event["id"]] = (sensor_type, payload["timestamp"])
+            else:
+                self._latency.add_event(sensor_type, max(delay, 0))
+
+        if event.get("type") not in DEVICE_TRIGGERS:
+            return
+
+        for sensor_id in (
+            event.get("source_id", "").lower(),
+            event.get("o", {}).get("id"),
+        ):
+            if sensor_id:
+                self._detected[sensor_id] = event
+
+    def _start_transition(self, target=None):
+        self._transition_started = time.time()
+        self._transition_target = target
+        self._notify(TRANSITION_STARTED, {})
+
+    def poll_transition(self):
+        if self._transition_started is None:
+            return True
+        if self._maintenance:
+            # nothing is polled during maintenance, but the timeout still applies
+            duration = round(time.time() - self._transition_started, 1)
+            if duration > ARMING_POLL_TIMEOUT:
+                return self._finish_transition(False, duration)
+            return False
+        if not self._transition_lock.acquire(blocking=False):
+            return False
+
+        try:
+            previous_mode = self.get_alarm_mode()
+            self._intrusion_data = self._do_request(
+                "GET", self._url_api + "/v3/me/user/intrusion-settings"
+            )
+            settings = self._intrusion_data["intrusion_settings"]
+            self._update_alarm_state()
+            completed = (
+                settings["active_mode"]
+                == (self._transition_target or settings["requestedMode"])
+                and not self._mode_transition
+            )
+        except (
+            KeyError,
+            TypeError,
+            ValueError,
+            requests.exceptions.RequestException,
+        ):
+            # an unreachable cloud counts as not completed, the timeout applies
+            completed = False
+        finally:
+            self._transition_lock.release()
+
+        duration = round(time.time() - self._transition_started, 1)
+
+        if completed or duration > ARMING_POLL_TIMEOUT:
+            return self._finish_transition(completed, duration)
+
+        if self.get_alarm_mode() != previous_mode:
+            self._notify(UPDATE_ALARM, {})
+
+        return False
+
+    def _finish_transition(self, completed, duration):
+        _LOGGER.debug("Mode transition completed: %s in %ss", completed, duration)
+        self._transition_started = None
+        self._transition_target = None
+        self._notify(UPDATE_ALARM, {})
+        self._notify(
+            EVENT_MODE_CHANGED,
+            {
+                "state": self._state,
+                "target_state": self._target_state,
+                "completed": completed,
+                "duration": duration,
+            },
+        )
+
+        return True
+
+    def get_event_history(self, sensor_id, count=None):
+        return self._history.get(sensor_id, count)
+
+    def get_energy(self, sensor_id):
+        if sensor_id not in self._energy:
+            return None
+        return round(self._energy[sensor_id].total, 3)
+
+    def get_power_rollup(self, sensor_id):
+        if sensor_id not in self._power_rollup:
+            return []
+        return self._power_rollup[sensor_id].to_list()
+
+    def get_latency(self):
+        return self._latency.summary()
+
+    def prefetch_snapshot(self, camera_id, event_id):
+        try:
+            with self._snapshot_lock:
+                if event_id not in self._snapshots:
+                    self._fetch_snapshot(camera_id, event_id)
+        except (OSError, requests.exceptions.RequestException) as err:
+            _LOGGER.error("Snapshot prefetch for %s failed: %s", camera_id, err)
+
+    def get_camera_image(self, camera_id):
+        if self._snapshots is None:
+            return None
+
+        with self._snapshot_lock:
+            key, fetched = self._latest_snapshot.get(camera_id, (None, 0))
+            if time.time() - fetched > CAMERA_SNAPSHOT_MAX_AGE:
+                key = camera_id + "_" + str(int(time.time()))
+                if not self._fetch_snapshot(camera_id, key):
+                    return None
+
+        return self._snapshots.get(key)
+
+    def get_camera_attributes(self, camera_id):
+        key, fetched = self._latest_snapshot.get(camera_id, (None, None))
+        attributes = {"snapshot": key}
+        if fetched is not None:
+            attributes["fetched"] = (
+                datetime.fromtimestamp(fetched).astimezone().isoformat()
+            )
+
+        return attributes
+
+    def _fetch_snapshot(self, camera_id, key):
+        url = self._url_api + "/v1/me/cameras/" + camera_id.upper() + "/snapshot"
+        self._rate_limiter.acquire()
+        response = self._transport.stream(url + "?fresh=true", headers=HEADER_GSE)
+
+        try:
+            if not response.ok:
+                _LOGGER.error(
+                    "Snapshot request: [%s] %s %s",
+                    response.status_code,
+                    response.reason,
+                    camera_id,
+                )
+                return False
+            size = self._snapshots.store(key, response.iter_content(CAMERA_CHUNK_SIZE))
+            self._transport.count("GET", url, response, size)
+        finally:
+            response.close()
+
+        self._latest_snapshot[camera_id] = (key, time.time())
+        self._trace.record("snapshot", camera=camera_id, key=key, size=size)
+
+        return True
+
+    def close(self):
+        self._prefetch.shutdown(wait=False)
+        self._save_energy()
+
+        # tracemalloc traces the whole process until the profiler stops it
+        profiler, self._profiler = self._profiler, None
+        if profiler is not None:
+            profiler.stop()
+            _LOGGER.info("Profiling stopped before all refresh cycles completed")
+
+    def get_snapshot(self):
+        return {
+            "elements": self._elements_data,
+            "health": self._health_data,
+            "intrusion": self._intrusion_data,
+        }
+
+    def get_fleet_health(self, problem):
+        sensor_ids = self._health_index.get(problem)
+
+        return len(sensor_ids), {"sensor_ids": sensor_ids}
+
+    def get_bandwidth(self):
+        return self._transport.get_usage()
+
+    def get_connections(self):
+        return self._transport.get_pools()
+
+    def get_diagnostics(self):
+        return {
+            "latency": self.get_latency(),
+            "energy": {
+                sensor_id: accumulator.to_dict()
+                for sensor_id, accumulator in self._energy.items()
+            },
+            "power_rollup": {
+                sensor_id: rollup.to_list()
+                for sensor_id, rollup in self._power_rollup.items()
+            },
+            "event_cursor": self._last_event,
+            "command_queue": self._commands.to_list(),
+            "fleet_health": self._health_index.summary(),
+            "bandwidth": self.get_bandwidth(),
+            "connections": self.get_connections(),
+            "trace": self._trace.to_list(),
+            "event_history": {
+                sensor_id: self._history.get(sensor_id)
+                for sensor_id in self._history.sensors()
+            },
+        }
+
+    def get_alarm_mode(self):
+        if self._mode_transition:
+            if self._target_state == STATE_ALARM_DISARMED:
+                return STATE_ALARM_DISARMING
+            return STATE_ALARM_ARMING
+
+        return self._state
+
+    def get_alarm_status(self, refresh=True):
+        if self.api_calls_allowed and refresh:
+            self.refresh()
+        else:
+            return self._state, self._target_state
+
+        return self.get_alarm_mode(), self._target_state
+
+    def get_sensor_list(self, sensor_type, sensor_list):
+        sensor_id_list = []
+
+        if sensor_type == "base":
+            sensor_id_list.extend(self._basestations)
+        elif sensor_type == "camera":
+            try:
+                for item in self._elements_data["yc01"]:
+                    sensor_id_list.append(item["id"].lower())
+            except (KeyError, ValueError):
+                pass
+        else:
+            for sensor_code, sensor_fullname in sensor_list.items():
+                if sensor_fullname == sensor_type:
+                    for sensor_id, (_, item) in self._subelements.items():
+                        if item["type"].split(".")[1] == sensor_code:
+                            sensor_id_list.append(sensor_id)
+
+        return sensor_id_list
+
+    def get_sensor_attributes(self, item, attr, basestation=None):
+        basestation = basestation or self._get_basestation()
+        try:
+            attr["battery_low"] = item.get("permanentBatteryLow", None)
+            attr["battery_saver_mode"] = item.get("states", {}).get("batterySaverMode")
+            attr["battery_status"] = item.get("batteryStatus", None)
+            attr["calibration_status"] = item.get("calibrationStatus", None)
+            attr["chamber_fail"] = item.get("smokeChamberFail", None)
+            attr["connection_status"] = item.get(
+                "connectionStatus", basestation["connectionStatus"]
+            )
+            attr["custom_name"] = item.get("friendlyName", basestation["friendlyName"])
+            attr["duration"] = item.get("runtimeConfiguration", {}).get(
+                "durationInSeconds"
+            )
+            attr["firmware_status"] = item.get(
+                "firmwareStatus", basestation["firmwareStatus"]
+            )
+            attr["setpoint"] = item.get("runtimeConfiguration", {}).get(
+                "setPoint"
+            ) or item.get("states", {}).get("setPoint")
+            attr["test_required"] = item.get(
+                "testRequired", item.get("states", {}).get("testRequired")
+            )
+            attr["unmounted"] = item.get("unmounted", None)
+
+        except (KeyError, ValueError):
+            pass
+
+        try:
+            attr["start_time"] = (
+                datetime.fromtimestamp(
+                    item.get("runtimeConfiguration", {}).get("startTimestampInSeconds")
+                )
+                .astimezone()
+                .isoformat()
+            )
+        except (KeyError, TypeError, ValueError):
+            pass
+
+        if self._maintenance:
+            attr["stale"] = True
+
+        return {k: v for k, v in attr.items() if v is not None}
+
+    def get_sensor_type(self, sensor_id):
+        if sensor_id in self._subelements:
+            return self._subelements[sensor_id][1]["type"]
+        return None
+
+    def get_sensor_state(self, sensor_id, sensor_attribute):
+        sensor_attributes = {}
+        sensor_state = False
+        if sensor_id in self._subelements:
+            basestation, item = self._subelements[sensor_id]
+            try:
+                if item[sensor_attribute] in ["tilted", "open", "online"]:
+                    sensor_state = True
+                elif item[sensor_attribute] == "closed":
+                    sensor_state = False
+                elif not item[sensor_attribute]:
+                    sensor_state = False
+                elif item[sensor_attribute]:
+                    sensor_state = True
+                sensor_attributes = self.get_sensor_attributes(
+                    item, attr={}, basestation=basestation
+                )
+            except (KeyError, ValueError):
+                pass
+
+        return sensor_state, sensor_attributes
+
+    def get_measurement_list(self):
+        measurement_list = []
+
+        for sensor_id, (_, item) in self._subelements.items():
+            sensor_code = item["type"].split(".")[1]
+            for reading in MEASUREMENT_NAME.get(sensor_code, []):
+                if MEASUREMENT_STATE_MAP[reading] in item.get("states", {}):
+                    measurement_list.append((sensor_code, sensor_id, reading))
+
+        return measurement_list
+
+    def get_measurement(self, sensor_id, reading):
+        try:
+            value = self._subelements[sensor_id][1]["states"][
+                MEASUREMENT_STATE_MAP[reading]
+            ]
+            return round(float(value), 1)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get_privacy_status(self, mode=None):
+        mode = mode or self._intrusion_data["intrusion_settings"]["active_mode"]
+
+        for item in self._intrusion_data["intrusion_settings"]["modes"]:
+            try:
+                privacy_on = item[mode]["privacy_mode"]
+            except (KeyError, ValueError):
+                pass
+
+        return STATE_ON if privacy_on else STATE_OFF
+
+    def set_privacy_status(self, mode, action):
+        target = list(DEVICE_MODE_MAP.keys())[
+            list(DEVICE_MODE_MAP.values()).index(mode)
+        ]
+        result = self.send_command(
+            {ATTR_COMMAND: "privacy", ATTR_TARGET: target, ATTR_VALUE: action}
+        )
+
+        return result["outcome"] != COMMAND_FAILED
+
+    def _write_privacy_status(self, mode, action):
+        payload = {"intrusion_settings": {"modes": [{mode: {"privacy_mode": action}}]}}
+        response = self._do_request(
+            "PUT",
+            self._url_api + "/v3/me/user/intrusion-settings",
+            json.dumps(payload),
+            parse=False,
+        )
+        _LOGGER.info("Setting privacy mode for %s to %s", mode, action)
+
+        return response.ok
+
+    def get_plug_state(self, sensor_id):
+        sensor_attributes = {}
+        plug_state = STATE_UNKNOWN
+
+        if sensor_id in self._subelements:
+            basestation, item = self._subelements[sensor_id]
+            try:
+                if item["states"]["relay"] == "off":
+                    plug_state = STATE_OFF
+                elif item["states"]["relay"] == "on":
+                    plug_state = STATE_ON
+                else:
+                    plug_state = STATE_UNKNOWN
+                sensor_attributes = self.get_sensor_attributes(
+                    item, attr={}, basestation=basestation
+                )
+            except (KeyError, ValueError):
+                pass
+
+        return plug_state, sensor_attributes
+
+    def set_thermostat_setpoint(self, sensor_id, setpoint):
+        result = self.send_command(
+            {ATTR_COMMAND: "thermostat", ATTR_TARGET: sensor_id, ATTR_VALUE: setpoint}
+        )
+
+        return result["outcome"] != COMMAND_FAILED
+
+    def _write_thermostat_setpoint(self, sensor_id, setpoint):
+        _LOGGER.info("Setting thermostat %s: %s", sensor_id, setpoint)
+
+        payload = {"setPoint": setpoint}
+        response = self._do_request(
+            "PUT",
+            self._url_api
+            + "/v2/me/elements/bs01.ts01/"
+            + self._get_basestation(sensor_id)["id"]
+            + "."
+            + sensor_id
+            + "/runtime-configuration",
+            json.dumps(payload),
+            parse=False,
+        )
+
+        return response.ok
+
+    def get_climate_state(self, sensor_id, sensor_type):
+        sensor_attributes = {}
+        climate_state = STATE_UNKNOWN
+
+        if sensor_id in self._subelements:
+            basestation, item = self._subelements[sensor_id]
+            try:
+                sensor_attributes = self.get_sensor_attributes(
+                    item, attr={}, basestation=basestation
+                )
+                climate_state = round(float(item["states"]["temperature"]), 1)
+            except (KeyError, ValueError):
+                pass
+
+        return climate_state, sensor_attributes
+
+    def get_alarm_health(self, sensor_id=None):
+        sensor_attributes = {}
+
+        try:
+            self._health = self._health_data.get("systemHealth", STATE_UNKNOWN)
+
+            sensor_attributes = self.get_sensor_attributes(
+                item={}, attr={}, basestation=self._get_basestation(sensor_id)
+            )
+            sensor_attributes["alarm_mode"] = self._state
+            sensor_attributes["today_events"] = self._dashboard_data["result"][
+                "recentEventsNumber"
+            ]
+            sensor_attributes["today_recordings"] = self._dashboard_data["result"][
+                "recentEventCounts"
+            ]["yc01.recording"]
+            sensor_attributes["privacy_mode"] = self.get_privacy_status()
+
+            for item in self._dashboard_data["result"]["recentHomecomings"]:
+                try:
+                    time_stamp = int(item["ts"]) / 1000
+                    sensor_attributes["recent_homecoming"] = str(
+                        datetime.fromtimestamp(time_stamp).astimezone().isoformat()
+                    )
+                except (KeyError, ValueError):
+                    pass
+
+            for item in self._dashboard_data["result"]["recentHomeleavings"]:
+                try:
+                    time_stamp = int(item["ts"]) / 1000
+                    sensor_attributes["recent_homeleaving"] = str(
+                        datetime.fromtimestamp(time_stamp).astimezone().isoformat()
+                    )
+                except (KeyError, ValueError):
+                    pass
+
+        except (KeyError, ValueError):
+            pass
+
+        return self._health, sensor_attributes
+
+    def set_alarm_status(self, action):
+        result = self.send_command({ATTR_COMMAND: "alarm", ATTR_VALUE: action})
+
+        return result["outcome"] != COMMAND_FAILED
+
+    def _write_alarm_status(self, action):
+        _LOGGER.info("Setting alarm panel to %s", action)
+
+        payload = {"intrusion_settings": {"active_mode": DEVICE_MODE_MAP[action]}}
+        response = self._do_request(
+            "PUT",
+            self._url_api + "/v3/me/user/intrusion-settings",
+            json.dumps(payload),
+            parse=False,
+        )
+        if response.ok:
+            self._start_transition(DEVICE_MODE_MAP[action])
+
+        return response.ok
+
+    def set_plug_status(self, sensor_id, action):
+        result = self.send_command(
+            {ATTR_COMMAND: "plug", ATTR_TARGET: sensor_id, ATTR_VALUE: action}
+        )
+
+        return result["outcome"] != COMMAND_FAILED
+
+    def _write_plug_status(self, sensor_id, action):
+        _LOGGER.info("Set plug %s: %s", sensor_id, action)
+
+        sensor_type = self.get_sensor_type(sensor_id)
+        payload = {"name": action}
+        response = self._do_request(
+            "POST",
+            self._url_api
+            + "/v2/me/elements/"
+            + sensor_type
+            + "/"
+            + self._get_basestation(sensor_id)["id"]
+            + "."
+            + sensor_id
+            + "/cmds",
+            json.dumps(payload),
+            parse=False,
+        )
+
+        return response.ok
+
+    def _check_command(self, command):
+        if command[ATTR_COMMAND] in ["plug", "thermostat"]:
+            if command[ATTR_TARGET] not in self._subelements:
+                raise ValueError("Unknown sensor id " + command[ATTR_TARGET])
+
+    def _do_command(self, command):
+        self._check_command(command)
+        self._rate_limiter.acquire()
+
+        if command[ATTR_COMMAND] == "alarm":
+            return self._write_alarm_status(command[ATTR_VALUE])
+        if command[ATTR_COMMAND] == "plug":
+            return self._write_plug_status(command[ATTR_TARGET], command[ATTR_VALUE])
+        if command[ATTR_COMMAND] == "privacy":
+            return self._write_privacy_status(
+                DEVICE_MODE_MAP[command[ATTR_TARGET]], command[ATTR_VALUE]
+            )
+        return self._write_thermostat_setpoint(
+            command[ATTR_TARGET], command[ATTR_VALUE]
+        )
+
+    def _command_outcome(self, command, outcome, error=None):
+        result = {**command, "outcome": outcome}
+        if error is not None:
+            result["error"] = str(error)
+        if outcome != COMMAND_QUEUED:
+            self._notify(EVENT_COMMAND, result)
+
+        return result
+
+    def _run_command(self, command):
+        try:
+            success = self._do_command(command)
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.RetryError,
+            requests.exceptions.Timeout,
+        ):
+            return None
+        except (
+            KeyError,
+            TypeError,
+            ValueError,
+            requests.exceptions.RequestException,
+        ) as err:
+            return self._command_outcome(command, COMMAND_FAILED, err)
+
+        return self._command_outcome(
+            command, COMMAND_SUCCESS if success else COMMAND_FAILED
+        )
+
+    def _queue_command(self, command):
+        command["queued"] = int(time.time() * 1000)
+        superseded = self._commands.add(command)
+        if superseded is not None:
+            self._command_outcome(superseded, COMMAND_SUPERSEDED)
+        self._save_commands()
+
+        _LOGGER.info(
+            "Cloud unreachable, queued %s command for %s",
+            command[ATTR_COMMAND],
+            command[ATTR_TARGET],
+        )
+
+        return self._command_outcome(command, COMMAND_QUEUED)
+
+    def _save_commands(self):
+        if self._store:
+            self._store.save("command_queue", self._commands.to_list())
+
+    def send_command(self, command):
+        command = {
+            ATTR_COMMAND: command[ATTR_COMMAND],
+            ATTR_TARGET: command.get(ATTR_TARGET),
+            ATTR_VALUE: command[ATTR_VALUE],
+        }
+        try:
+            self._check_command(command)
+        except ValueError as err:
+            return self._command_outcome(command, COMMAND_FAILED, err)
+
+        # commands wait behind queued ones to be replayed in order
+        if self._maintenance or len(self._commands):
+            return self._queue_command(command)
+
+        return self._run_command(command) or self._queue_command(command)
+
+    def _replay_commands(self):
+        if not self._replay_lock.acquire(blocking=False):
+            return
+
+        _LOGGER.info("Replaying %s queued commands", len(self._commands))
+        try:
+            while True:
+                command = self._commands.peek()
+                if command is None:
+                    break
+                if time.time() - command["queued"] / 1000 > COMMAND_MAX_AGE:
+                    self._command_outcome(command, COMMAND_EXPIRED)
+                elif self._run_command(command) is None:
+                    break
+                self._commands.remove(command)
+                self._save_commands()
+        finally:
+            self._replay_lock.release()
+
+    def bulk_command(self, commands):
+        # one result per command in input order, only the last command per
+        # target is sent and the earlier ones are superseded
+        results = [None] * len(commands)
+        latest = {}
+        for index, command in enumerate(commands):
+            if command[ATTR_COMMAND] not in BULK_COMMANDS:
+                results[index] = self._command_outcome(
+                    command, COMMAND_FAILED, "Unsupported command"
+                )
+                continue
+            key = command_key(command)
+            if key in latest:
+                results[latest[key]] = self._command_outcome(
+                    commands[latest[key]], COMMAND_SUPERSEDED
+                )
+            latest[key] = index
+
+        _LOGGER.info(
+            "Bulk command: %s of %s commands after coalescing",
+            len(latest),
+            len(commands),
+        )
+
+        if latest:
+            indexes = sorted(latest.values())
+            with ThreadPoolExecutor(
+                max_workers=min(BULK_MAX_CONCURRENCY, len(indexes))
+            ) as executor:
+                sent = executor.map(
+                    self.send_command, [commands[index] for index in indexes]
+                )
+                for index, result in zip(indexes, sent):
+                    results[index] = result
+
+        return [
+            {**result, "success": result["outcome"] == COMMAND_SUCCESS}
+            for result in results
+        ]
+
+    def set_panic_alarm(self, action):
+        _LOGGER.info("Set panic alarm: %s", action)
+
+        if action == STATE_ON:
+            payload = {"action": "alarm.user.start"}
+            self._do_request(
+                "POST",
+                self._url_api + "/v1/me/devices/webfrontend/sink",
+                json.dumps(payload),
+            )
+        else:
+            self._do_request("DELETE", self._url_api + "/v1/me/states/userAlarm")
+
+    def get_panic_alarm(self):
+        try:
+            if self._health_data["statusMsgId"] == "alarm.user":
+                panic_state = STATE_ON
+            else:
+                panic_state = STATE_OFF
+        except (KeyError, ValueError):
+            panic_state = STATE_OFF
+
+        return panic_state
+
+    def get_event_detected(self, sensor_id, sensor_type_name):
+        button_press = STATE_IDLE
+        sensor_state = False
+        sensor_attributes = {}
+
+        item = self._detected.get(sensor_id)
+        if item is not None:
+            sensor_state = True
+            unshown = self._unshown.pop(item["id"], None)
+            if unshown is not None:
+                sensor_type, timestamp = unshown
+                self._latency.add_event(
+                    sensor_type, max(time.time() - timestamp / 1000, 0)
+                )
+            if (
+                item["type"] in BUTTON_PRESS_MAP
+                and item.get("o", {}).get("id") == sensor_id
+            ):
+                button_press = BUTTON_PRESS_MAP[item["type"]]
+
+        if len(sensor_id) == 12:
+            for item in self._elements_data["yc01"]:
+                if item["id"] == sensor_id.upper():
+                    sensor_attributes = self.get_sensor_attributes(item, attr={})
+        elif sensor_id in self._subelements:
+            basestation, item = self._subelements[sensor_id]
+            sensor_attributes = self.get_sensor_attributes(
+                item, attr={}, basestation=basestation
+            )
+            if sensor_type_name in BUTTON_PRESS_MAP:
+                sensor_attributes["press"] = button_press
+
+        return sensor_state, sensor_attributes
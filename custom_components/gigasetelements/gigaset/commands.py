@@ -0,0 +1,46 @@
+"""
+Gigaset Elements command queue for commands sent while the cloud is unreachable.
+"""
+import threading
+
+from collections import OrderedDict
+
+from .const import ATTR_COMMAND, ATTR_TARGET
+
+
+def command_key(command):
+    return (command[ATTR_COMMAND], command.get(ATTR_TARGET))
+
+
+class CommandQueue:
+    def __init__(self, commands=None):
+        self._commands = OrderedDict()
+        self._lock = threading.Lock()
+        for command in commands or []:
+            self.add(command)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._commands)
+
+    def add(self, command):
+        # only the last command per target matters, it moves to the end
+        with self._lock:
+            superseded = self._commands.pop(command_key(command), None)
+            self._commands[command_key(command)] = command
+
+        return superseded
+
+    def peek(self):
+        with self._lock:
+            return next(iter(self._commands.values()), None)
+
+    def remove(self, command):
+        # a command superseded while it was sent stays queued
+        with self._lock:
+            if self._commands.get(command_key(command)) is command:
+                del self._commands[command_key(command)]
+
+    def to_list(self):
+        with self._lock:
+            return list(self._commands.values())
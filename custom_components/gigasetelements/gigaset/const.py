@@ -0,0 +1,190 @@
+"""Constants used by the Gigaset Elements client."""
+
+API_RATE_BURST = 10
+API_RATE_LIMIT = 5
+
+ARMING_POLL_INTERVAL = 2
+ARMING_POLL_TIMEOUT = 300
+
+ATTR_COMMAND = "command"
+ATTR_TARGET = "target"
+ATTR_VALUE = "value"
+
+AUTH_GSE_EXPIRE = 14400
+
+BINARY_SENSOR_NAME = {
+    "bn01": "button",
+    "ds01": "door",
+    "ds02": "door",
+    "is01": "siren",
+    "ps01": "motion",
+    "ps02": "motion",
+    "sd01": "smoke",
+    "um01": "universal",
+    "wd01": "water",
+    "ws02": "window",
+    "yc01": "camera",
+}
+
+BULK_COMMANDS = ["alarm", "plug", "privacy", "thermostat"]
+BULK_MAX_CONCURRENCY = 10
+
+BUTTON_PRESS_MAP = {
+    "button": "idle",
+    "button1": "short",
+    "button2": "double",
+    "button3": "long",
+    "button4": "very_long",
+}
+
+CAMERA_CHUNK_SIZE = 65536
+CAMERA_MOTION = "yc01.motion"
+CAMERA_SNAPSHOT_MAX_AGE = 60
+CLOUD_STATUS_INTERVAL = 300
+CLOUD_STATUS_MAINTENANCE_INTERVAL = 30
+
+COMMAND_EXPIRED = "expired"
+COMMAND_FAILED = "failed"
+COMMAND_MAX_AGE = 3600
+COMMAND_QUEUED = "queued"
+COMMAND_SUCCESS = "success"
+COMMAND_SUPERSEDED = "superseded"
+
+DEVICE_MODE_MAP = {
+    "armed_away": "away",
+    "armed_home": "custom",
+    "armed_night": "night",
+    "disarmed": "home",
+}
+
+DEVICE_TRIGGERS = [
+    "button1",
+    "button2",
+    "button3",
+    "button4",
+    "movement",
+    "open",
+    "sirenon",
+    "smoke_detected",
+    "test",
+    "tilt",
+    "water_detected",
+    "yc01.motion",
+]
+
+ELEMENTS_CHANGED = "elements_changed"
+ELEMENTS_REMOVE_AFTER = 3
+
+ENERGY_MAX_GAP = 900
+ENERGY_ROLLUP_SIZE = 288
+ENERGY_ROLLUP_WINDOW = 300
+ENERGY_SAVE_INTERVAL = 300
+
+EVENT_BACKFILL_MAX_PAGES = 50
+EVENT_COMMAND = "gigasetelements_command"
+EVENT_DEDUPE_SIZE = 1000
+EVENT_GSE = "gigasetelements_event"
+EVENT_HISTORY_SIZE = 50
+EVENT_MODE_CHANGED = "gigasetelements_mode_changed"
+EVENT_PAGE_SIZE = 100
+
+HEADER_GSE = {
+    "content-type": "application/json; charset=UTF-8",
+    "user-agent": "AppGigasetElements-Android/9.10.8 (23103115)",
+}
+
+HEALTH_PROBLEMS = [
+    "battery",
+    "chamber",
+    "connection",
+    "firmware",
+    "test_required",
+    "unmounted",
+]
+
+JOURNAL_REDACTED = "**REDACTED**"
+
+JOURNAL_REDACT_KEYS = [
+    "authorization",
+    "cookie",
+    "email",
+    "password",
+    "set-cookie",
+    "token",
+]
+
+JOURNAL_VOLATILE_PARAMS = ["from_ts", "to_ts"]
+
+LATENCY_MAX_DELAY = 600
+LATENCY_WINDOW = 500
+
+MEASUREMENT_NAME = {
+    "cl01": ["humidity", "pressure"],
+    "sp01": ["power"],
+    "sp02": ["power"],
+    "ts01": ["temperature"],
+    "um01": ["temperature"],
+}
+
+MEASUREMENT_STATE_MAP = {
+    "humidity": "humidity",
+    "power": "momentaryPowerMeasurement",
+    "pressure": "pressure",
+    "temperature": "temperature",
+}
+
+PROFILE_TOP = 30
+
+PROXY_EVENT_SIZE = 1000
+PROXY_HOST = "127.0.0.1"
+
+SENSOR_NAME = {
+    "bs01": "base",
+    "cl01": "climate",
+}
+
+STATE_ALARM_ARMED_AWAY = "armed_away"
+STATE_ALARM_ARMED_HOME = "armed_home"
+STATE_ALARM_ARMED_NIGHT = "armed_night"
+STATE_ALARM_ARMING = "arming"
+STATE_ALARM_DISARMED = "disarmed"
+STATE_ALARM_DISARMING = "disarming"
+STATE_ALARM_TRIGGERED = "triggered"
+STATE_IDLE = "idle"
+STATE_OFF = "off"
+STATE_ON = "on"
+STATE_UNKNOWN = "unknown"
+
+STATE_UPDATE_INTERVAL = 10
+
+SWITCH_NAME = {
+    "sp01": "plug",
+    "sp02": "plug",
+}
+
+TARGET_TEMP_HIGH = 30.0
+TARGET_TEMP_LOW = 5.0
+TARGET_TEMP_STEP = 0.5
+
+THERMOSTAT_NAME = {
+    "ts01": "thermostat",
+}
+
+TRACE_PAYLOAD_SIZE = 2000
+TRACE_SIZE = 200
+
+TRANSITION_STARTED = "transition_started"
+
+TRANSPORT_LIVE = "live"
+TRANSPORT_RECORD = "record"
+TRANSPORT_REPLAY = "replay"
+TRANSPORT_MODES = [TRANSPORT_LIVE, TRANSPORT_RECORD, TRANSPORT_REPLAY]
+TRANSPORT_POOL_HOSTS = 3
+TRANSPORT_POOL_SIZE = BULK_MAX_CONCURRENCY + 2
+TRANSPORT_WARM_TIMEOUT = 10
+
+UPDATE_ALARM = "alarm_update"
+
+URL_GSE_API = "https://api.gigaset-elements.de/api"
+URL_GSE_AUTH = "https://im.gigaset-elements.de/identity/api/v2/user/login"
+URL_GSE_CLOUD = "https://status.gigaset-elements.de/api/v1/status"
@@ -0,0 +1,67 @@
+"""
+Gigaset Elements energy accumulation and power rollups for smart plugs.
+"""
+from collections import deque
+
+
+class EnergyAccumulator:
+    def __init__(self, max_gap, total=0.0, timestamp=None, power=None):
+        self._max_gap = max_gap
+        self.total = total
+        self.timestamp = timestamp
+        self.power = power
+
+    def add(self, timestamp, power):
+        if self.timestamp is not None:
+            elapsed = timestamp - self.timestamp
+            if elapsed <= 0:
+                return
+            # consumption across a gap longer than max_gap is unknown
+            if elapsed <= self._max_gap:
+                self.total += (self.power + power) / 2 * elapsed / 3600000
+        self.timestamp = timestamp
+        self.power = power
+
+    def to_dict(self):
+        return {"total": self.total, "timestamp": self.timestamp, "power": self.power}
+
+
+class PowerBucket:
+    __slots__ = ("start", "minimum", "maximum", "total", "count")
+
+    def __init__(self, start, power):
+        self.start = start
+        self.minimum = power
+        self.maximum = power
+        self.total = power
+        self.count = 1
+
+    def add(self, power):
+        self.minimum = min(self.minimum, power)
+        self.maximum = max(self.maximum, power)
+        self.total += power
+        self.count += 1
+
+    def as_dict(self):
+        return {
+            "start": self.start,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": round(self.total / self.count, 1),
+        }
+
+
+class PowerRollup:
+    def __init__(self, window, maxlen):
+        self._window = window
+        self._buckets = deque(maxlen=maxlen)
+
+    def add(self, timestamp, power):
+        start = int(timestamp - timestamp % self._window)
+        if self._buckets and self._buckets[-1].start == start:
+            self._buckets[-1].add(power)
+        elif not self._buckets or self._buckets[-1].start < start:
+            self._buckets.append(PowerBucket(start, power))
+
+    def to_list(self):
+        return [bucket.as_dict() for bucket in self._buckets]
@@ -0,0 +1,47 @@
+"""
+Gigaset Elements event helpers.
+"""
+from collections import deque
+
+from .const import BUTTON_PRESS_MAP
+
+
+class EventDeduplicator:
+    def __init__(self, maxlen, event_ids=None):
+        self._order = deque(maxlen=maxlen)
+        self._seen = set()
+        for event_id in event_ids or []:
+            self.seen(event_id)
+
+    def __len__(self):
+        return len(self._order)
+
+    def seen(self, event_id):
+        if event_id in self._seen:
+            return True
+
+        if len(self._order) == self._order.maxlen:
+            self._seen.discard(self._order[0])
+        self._order.append(event_id)
+        self._seen.add(event_id)
+
+        return False
+
+    def to_list(self):
+        return list(self._order)
+
+
+def event_payload(event):
+    source = event.get("o", {})
+    payload = {
+        "event_id": event.get("id"),
+        "event_type": event.get("type"),
+        "source_id": event.get("source_id", "").lower(),
+        "sensor_id": source.get("id"),
+        "sensor_type": source.get("type"),
+        "timestamp": int(event["ts"]),
+    }
+    if event.get("type") in BUTTON_PRESS_MAP:
+        payload["press"] = BUTTON_PRESS_MAP[event["type"]]
+
+    return {k: v for k, v in payload.items() if v is not None}
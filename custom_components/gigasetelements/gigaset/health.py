@@ -0,0 +1,56 @@
+"""
+Gigaset Elements fleet health index of devices grouped by problem class.
+"""
+from .const import HEALTH_PROBLEMS
+
+
+def device_problems(item):
+    states = item.get("states", {})
+    problems = {
+        "battery": item.get("permanentBatteryLow") is True,
+        "chamber": item.get("smokeChamberFail") is True,
+        "connection": item.get("connectionStatus", "online") != "online",
+        "firmware": item.get("firmwareStatus", "up_to_date") != "up_to_date",
+        "test_required": item.get("testRequired", states.get("testRequired")) is True,
+        "unmounted": item.get("unmounted") is True,
+    }
+
+    return frozenset(problem for problem, found in problems.items() if found)
+
+
+class HealthIndex:
+    def __init__(self):
+        self._devices = {}
+        self._problems = {problem: set() for problem in HEALTH_PROBLEMS}
+
+    def __len__(self):
+        return len(self._devices)
+
+    def update(self, devices):
+        # only devices whose problems changed touch the index
+        changes = 0
+
+        for device_id in set(self._devices) - set(devices):
+            for problem in self._devices.pop(device_id):
+                self._problems[problem].discard(device_id)
+            changes += 1
+
+        for device_id, item in devices.items():
+            problems = device_problems(item)
+            previous = self._devices.get(device_id)
+            if previous == problems:
+                continue
+            self._devices[device_id] = problems
+            for problem in (previous or frozenset()) - problems:
+                self._problems[problem].discard(device_id)
+            for problem in problems - (previous or frozenset()):
+                self._problems[problem].add(device_id)
+            changes += 1
+
+        return changes
+
+    def get(self, problem):
+        return sorted(self._problems[problem])
+
+    def summary(self):
+        return {problem: len(ids) for problem, ids in self._problems.items()}
@@ -0,0 +1,54 @@
+"""
+Gigaset Elements local event history per sensor.
+"""
+from collections import deque
+
+
+class EventRecord:
+    __slots__ = ("event_id", "event_type", "timestamp")
+
+    def __init__(self, event_id, event_type, timestamp):
+        self.event_id = event_id
+        self.event_type = event_type
+        self.timestamp = timestamp
+
+    def as_dict(self):
+        return {
+            "event_id": self.event_id,
+            "event_type": self.event_type,
+            "timestamp": self.timestamp,
+        }
+
+    def as_list(self):
+        return [self.event_id, self.event_type, self.timestamp]
+
+
+class EventHistory:
+    def __init__(self, maxlen, data=None):
+        self._maxlen = maxlen
+        self._sensors = {}
+        for sensor_id, records in (data or {}).items():
+            for record in records:
+                try:
+                    self.add(sensor_id, *record)
+                except TypeError:
+                    pass
+
+    def add(self, sensor_id, event_id, event_type, timestamp):
+        if sensor_id not in self._sensors:
+            self._sensors[sensor_id] = deque(maxlen=self._maxlen)
+        self._sensors[sensor_id].append(EventRecord(event_id, event_type, timestamp))
+
+    def get(self, sensor_id, count=None):
+        records = self._sensors.get(sensor_id, ())
+        count = len(records) if count is None else min(count, len(records))
+        return [records[-i].as_dict() for i in range(1, count + 1)]
+
+    def sensors(self):
+        return list(self._sensors)
+
+    def to_dict(self):
+        return {
+            sensor_id: [record.as_list() for record in records]
+            for sensor_id, records in self._sensors.items()
+        }
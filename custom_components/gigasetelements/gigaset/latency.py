@@ -0,0 +1,55 @@
+"""
+Gigaset Elements latency instrumentation.
+"""
+from collections import deque
+
+
+class LatencyWindow:
+    def __init__(self, maxlen):
+        self._samples = deque(maxlen=maxlen)
+
+    def add(self, value):
+        self._samples.append(value)
+
+    def summary(self):
+        if not self._samples:
+            return {"count": 0}
+        samples = sorted(self._samples)
+        return {
+            "count": len(samples),
+            "p50": round(samples[int(0.5 * (len(samples) - 1))], 3),
+            "p95": round(samples[int(0.95 * (len(samples) - 1))], 3),
+            "max": round(samples[-1], 3),
+        }
+
+
+class LatencyTracker:
+    def __init__(self, maxlen):
+        self._maxlen = maxlen
+        self._events = LatencyWindow(maxlen)
+        self._sensor_types = {}
+        self._phases = {}
+
+    def add_event(self, sensor_type, delay):
+        self._events.add(delay)
+        if sensor_type not in self._sensor_types:
+            self._sensor_types[sensor_type] = LatencyWindow(self._maxlen)
+        self._sensor_types[sensor_type].add(delay)
+
+    def add_phase(self, phase, duration):
+        if phase not in self._phases:
+            self._phases[phase] = LatencyWindow(self._maxlen)
+        self._phases[phase].add(duration)
+
+    def summary(self):
+        return {
+            **self._events.summary(),
+            "sensor_types": {
+                sensor_type: window.summary()
+                for sensor_type, window in sorted(self._sensor_types.items())
+            },
+            "phases": {
+                phase: window.summary()
+                for phase, window in sorted(self._phases.items())
+            },
+        }
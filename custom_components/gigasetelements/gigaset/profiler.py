@@ -0,0 +1,78 @@
+"""
+Gigaset Elements on-demand profiling of refresh cycles and entity updates.
+"""
+import cProfile
+import logging
+import os
+import pstats
+import threading
+import tracemalloc
+
+from .const import PROFILE_TOP
+
+_LOGGER = logging.getLogger(__name__)
+
+# the whole integration, the client core and the platform modules
+INTEGRATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CycleProfiler:
+    def __init__(self, cycles, path):
+        self._cycles = cycles
+        self._path = path
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._tracemalloc = not tracemalloc.is_tracing()
+        if self._tracemalloc:
+            tracemalloc.start()
+
+        _LOGGER.info("Profiling %s refresh cycles", cycles)
+
+    def run(self, func):
+        with self._lock:
+            self._profile.enable()
+            try:
+                func()
+            finally:
+                self._profile.disable()
+        self._cycles -= 1
+
+        return self._cycles <= 0
+
+    def measure(self, func, *args):
+        # one profile can only follow one thread at a time, entity updates
+        # running next to a refresh or another update are left out
+        if not self._lock.acquire(blocking=False):
+            return func(*args)
+        try:
+            self._profile.enable()
+            try:
+                return func(*args)
+            finally:
+                self._profile.disable()
+        finally:
+            self._lock.release()
+
+    def stop(self):
+        if self._tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def write(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, os.path.join(INTEGRATION_DIR, "*"))]
+        )
+        self.stop()
+
+        self._profile.dump_stats(self._path + ".prof")
+
+        with open(self._path + ".txt", "w", encoding="utf-8") as summary:
+            summary.write("Top functions by cumulative time\n")
+            stats = pstats.Stats(self._profile, stream=summary)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+                INTEGRATION_DIR, PROFILE_TOP
+            )
+            summary.write("Top allocations\n")
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+                summary.write(str(stat) + "\n")
+
+        _LOGGER.info("Profile written to %s.prof and %s.txt", self._path, self._path)
@@ -0,0 +1,112 @@
+"""
+Gigaset Elements local caching proxy sharing one upstream poll with other readers.
+"""
+import hashlib
+import json
+import logging
+import threading
+
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .const import EVENT_GSE, PROXY_EVENT_SIZE, PROXY_HOST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ProxyRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            result = self.server.proxy.get(url.path, parse_qs(url.query))
+        except ValueError:
+            self.send_error(400)
+            return
+        if result is None:
+            self.send_error(404)
+            return
+
+        body, etag = result
+        if_none_match = self.headers.get("If-None-Match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        _LOGGER.debug("Proxy request: " + format, *args)
+
+
+class SnapshotProxy:
+    def __init__(self, client, port, host=PROXY_HOST):
+        self._client = client
+        self._events = deque(maxlen=PROXY_EVENT_SIZE)
+        self._cursor = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._remove_listener = None
+        self._server = ThreadingHTTPServer((host, port), ProxyRequestHandler)
+        self._server.daemon_threads = True
+        self._server.proxy = self
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def start(self):
+        self._remove_listener = self._client.add_listener(self._listener)
+        threading.Thread(
+            target=self._server.serve_forever, name="gigaset_proxy", daemon=True
+        ).start()
+
+        _LOGGER.info("Proxy listening on %s:%s", *self.address)
+
+    def stop(self):
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _listener(self, event_type, data):
+        if event_type == EVENT_GSE:
+            with self._lock:
+                self._cursor += 1
+                self._events.append((self._cursor, data))
+
+    def get(self, path, query):
+        if path == "/events":
+            since = int(query.get("since", ["0"])[0])
+            with self._lock:
+                cursor = self._cursor
+                events = [data for seq, data in self._events if seq > since]
+            return self._encode({"cursor": cursor, "events": events}), '"%s"' % cursor
+
+        name = path.strip("/")
+        snapshot = self._client.get_snapshot()
+        if name not in snapshot:
+            return None
+
+        data = snapshot[name]
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached is None or cached[0] is not data:
+                body = self._encode(data)
+                cached = (data, body, '"%s"' % hashlib.sha1(body).hexdigest())
+                self._cache[name] = cached
+
+        return cached[1], cached[2]
+
+    @staticmethod
+    def _encode(data):
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,99 @@
+"""
+Gigaset Elements camera snapshot cache on disk, bounded by size in LRU order.
+"""
+import logging
+import os
+import re
+import threading
+
+from collections import OrderedDict
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    def __init__(self, path, max_bytes):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if os.path.isdir(self._path):
+            self._load()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def _file(self, key):
+        return os.path.join(self._path, re.sub(r"[^\w.-]", "_", key) + ".jpg")
+
+    def _load(self):
+        files = []
+        for entry in os.scandir(self._path):
+            if entry.is_file() and entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+            elif entry.is_file() and entry.name.endswith(".part"):
+                os.remove(entry.path)
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._size += size
+        self._evict()
+
+        _LOGGER.debug("Loaded %s snapshots, %s bytes", len(self._entries), self._size)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            with open(self._file(key), "rb") as image:
+                data = image.read()
+            os.utime(self._file(key))
+        except OSError:
+            with self._lock:
+                self._size -= self._entries.pop(key, 0)
+            return None
+
+        return data
+
+    def store(self, key, chunks):
+        path = self._file(key)
+        part = path + ".part"
+        size = 0
+
+        os.makedirs(self._path, exist_ok=True)
+        try:
+            with open(part, "wb") as image:
+                for chunk in chunks:
+                    image.write(chunk)
+                    size += len(chunk)
+            os.replace(part, path)
+        finally:
+            if os.path.exists(part):
+                os.remove(part)
+
+        with self._lock:
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+
+        return size
+
+    def _evict(self):
+        while self._size > self._max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {"count": len(self._entries), "bytes": self._size}
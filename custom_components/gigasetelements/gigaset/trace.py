@@ -0,0 +1,37 @@
+"""
+Gigaset Elements bounded trace of requests and state decisions.
+"""
+import json
+import time
+
+from collections import deque
+
+from .transport import redact
+
+
+class TraceBuffer:
+    def __init__(self, maxlen, payload_size=0):
+        self._entries = deque(maxlen=maxlen)
+        self._payload_size = payload_size
+
+    def record(self, kind, payload=None, **fields):
+        fields["time"] = time.time()
+        fields["kind"] = kind
+        if self._payload_size and payload is not None:
+            fields["payload"] = self._truncate(payload)
+        self._entries.append(fields)
+
+    def to_list(self):
+        return [dict(entry) for entry in list(self._entries)]
+
+    def _truncate(self, payload):
+        # only the redacted head of a payload is kept, not the parsed response
+        if isinstance(payload, (dict, list)):
+            payload = json.dumps(redact(payload), separators=(",", ":"))
+        payload = str(payload)
+        if len(payload) > self._payload_size:
+            payload = payload[: self._payload_size] + "..."
+        return payload
+
+    def __len__(self):
+        return len(self._entries)
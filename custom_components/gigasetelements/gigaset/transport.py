@@ -0,0 +1,342 @@
+"""
+Gigaset Elements transport layer with live, record and replay modes.
+"""
+import gzip
+import json
+import logging
+import threading
+import time
+
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+
+from requests.packages.urllib3.exceptions import HTTPError
+from requests.packages.urllib3.util.retry import Retry
+
+from .const import (
+    JOURNAL_REDACT_KEYS,
+    JOURNAL_REDACTED,
+    JOURNAL_VOLATILE_PARAMS,
+    TRANSPORT_LIVE,
+    TRANSPORT_POOL_HOSTS,
+    TRANSPORT_POOL_SIZE,
+    TRANSPORT_RECORD,
+    TRANSPORT_REPLAY,
+    TRANSPORT_WARM_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+retry_strategy = Retry(
+    total=5,
+    backoff_factor=2,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["DELETE", "GET", "POST"],
+)
+
+adapter = None
+adapter_lock = threading.Lock()
+
+
+def shared_adapter(accounts=1):
+    # one keep-alive pool per host for all accounts, sized for the refresh,
+    # snapshot and bulk command threads of each, built when the first client
+    # starts and grown when more accounts are added
+    global adapter
+    pool_size = TRANSPORT_POOL_SIZE * max(accounts, 1)
+    with adapter_lock:
+        if adapter is None:
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=TRANSPORT_POOL_HOSTS,
+                pool_maxsize=pool_size,
+                max_retries=retry_strategy,
+            )
+        elif adapter._pool_maxsize < pool_size:
+            adapter.init_poolmanager(TRANSPORT_POOL_HOSTS, pool_size)
+        return adapter
+
+
+def create_session(accounts=1):
+    # every account keeps its own cookie jar on top of the shared pool
+    session = requests.Session()
+    session.mount("https://", shared_adapter(accounts))
+    session.mount("http://", shared_adapter(accounts))
+
+    return session
+
+
+def redact(data):
+    if isinstance(data, dict):
+        return {
+            k: JOURNAL_REDACTED if k in JOURNAL_REDACT_KEYS else redact(v)
+            for k, v in data.items()
+        }
+    if isinstance(data, list):
+        return [redact(item) for item in data]
+    return data
+
+
+def redact_payload(payload):
+    if not payload:
+        return payload
+    try:
+        return json.dumps(redact(json.loads(payload)), separators=(",", ":"))
+    except (TypeError, ValueError):
+        return JOURNAL_REDACTED
+
+
+def adapter_pool(session, url):
+    # the pool requests itself picks, its key depends on the TLS settings
+    # from requests 2.32 on
+    adapter = session.get_adapter(url)
+    if hasattr(adapter, "get_connection_with_tls_context"):
+        request = requests.Request("HEAD", url).prepare()
+        return adapter.get_connection_with_tls_context(request, session.verify)
+    return adapter.get_connection(url)
+
+
+def wire_size(response):
+    # urllib3 counts the bytes read from the socket before decompression
+    try:
+        return response.raw.tell()
+    except AttributeError:
+        return len(response.content)
+
+
+def journal_key(method, url):
+    parsed = urlparse(url)
+    path = parsed.netloc + parsed.path
+    query = urlencode(
+        [(k, v) for k, v in parse_qsl(parsed.query) if k not in JOURNAL_VOLATILE_PARAMS]
+    )
+    return method + " " + (path + "?" + query if query else path)
+
+
+class ReplayResponse:
+    def __init__(self, status_code, reason, content_type, text):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = {"content-type": content_type} if content_type else {}
+        self.text = text
+        self.content = text.encode("utf-8")
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class GigasetelementsTransport:
+    def __init__(self, session, mode=TRANSPORT_LIVE, journal=None, speed=1.0):
+        self._session = session
+        self._mode = mode
+        self._journal = journal
+        self._speed = speed
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._replay = defaultdict(deque)
+        self._usage = defaultdict(
+            lambda: {"requests": 0, "not_modified": 0, "wire_bytes": 0, "bytes": 0}
+        )
+
+        if self._mode != TRANSPORT_LIVE and not self._journal:
+            raise ValueError("Transport mode %s requires a journal" % self._mode)
+        if self._mode == TRANSPORT_REPLAY:
+            self._load_journal()
+
+        _LOGGER.debug("Transport mode: %s", self._mode)
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def get_cookies(self):
+        return [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+            }
+            for cookie in self._session.cookies
+        ]
+
+    def set_cookies(self, cookies):
+        for cookie in cookies:
+            self._session.cookies.set(**cookie)
+
+    def warm(self, urls):
+        if self._mode == TRANSPORT_REPLAY:
+            return
+
+        hosts = {urlparse(url).scheme + "://" + urlparse(url).netloc for url in urls}
+
+        def connect(host):
+            # straight on the pool of the session adapter, without its retries
+            try:
+                pool = adapter_pool(self._session, host + "/")
+                pool.urlopen("HEAD", "/", retries=False, timeout=TRANSPORT_WARM_TIMEOUT)
+            except (HTTPError, OSError) as err:
+                _LOGGER.debug("Warming %s failed: %s", host, err)
+
+        # resolve and handshake all hosts at once instead of on first use,
+        # setup goes on after the timeout while late workers finish unattended
+        executor = ThreadPoolExecutor(max_workers=len(hosts))
+        wait(
+            [executor.submit(connect, host) for host in hosts],
+            timeout=TRANSPORT_WARM_TIMEOUT,
+        )
+        executor.shutdown(wait=False)
+
+    def get_pools(self):
+        stats = {}
+        adapters = {id(adapter): adapter for adapter in self._session.adapters.values()}
+
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                # every new connection is a pool miss and, over https, a handshake
+                stats[pool.scheme + "://" + pool.host] = {
+                    "requests": pool.num_requests,
+                    "hits": max(pool.num_requests - pool.num_connections, 0),
+                    "misses": pool.num_connections,
+                    "handshakes": pool.num_connections if pool.scheme == "https" else 0,
+                }
+
+        return stats
+
+    def get_usage(self):
+        with self._lock:
+            return {endpoint: dict(usage) for endpoint, usage in self._usage.items()}
+
+    def count(self, method, url, response, size=None):
+        if size is None:
+            size = len(response.content)
+
+        with self._lock:
+            usage = self._usage[method + " " + urlparse(url).path]
+            usage["requests"] += 1
+            usage["not_modified"] += response.status_code == 304
+            usage["wire_bytes"] += wire_size(response)
+            usage["bytes"] += size
+
+    def request(self, method, url, payload="", headers=None):
+        if self._mode == TRANSPORT_REPLAY:
+            response = self._do_replay(method, url)
+            self.count(method, url, response)
+            return response
+
+        start = time.monotonic()
+        if method == "POST":
+            response = self._session.post(url, payload, headers=headers)
+        elif method == "PUT":
+            response = self._session.put(url, payload, headers=headers)
+        elif method == "DELETE":
+            response = self._session.delete(url)
+        else:
+            response = self._session.get(url, headers=headers)
+
+        if self._mode == TRANSPORT_RECORD:
+            self._do_record(method, url, payload, response, start)
+        self.count(method, url, response)
+
+        return response
+
+    def stream(self, url, headers=None):
+        if self._mode == TRANSPORT_REPLAY:
+            return self._do_replay("GET", url)
+
+        return self._session.get(url, headers=headers, stream=True)
+
+    def _do_record(self, method, url, payload, response, start):
+        content_type = response.headers.get("content-type", "")
+        text = response.text
+        if content_type.startswith("application/json"):
+            try:
+                text = json.dumps(redact(response.json()), separators=(",", ":"))
+            except ValueError:
+                pass
+
+        entry = {
+            "t": round(start - self._started, 3),
+            "d": round(time.monotonic() - start, 3),
+            "k": journal_key(method, url),
+            "p": redact_payload(payload),
+            "s": response.status_code,
+            "r": response.reason,
+            "c": content_type,
+            "b": text,
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+
+        with self._lock, gzip.open(self._journal, "at", encoding="utf-8") as journal:
+            journal.write(line)
+
+    def _load_journal(self):
+        count = 0
+        with gzip.open(self._journal, "rt", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._replay[entry["k"]].append(entry)
+                count += 1
+
+        _LOGGER.info("Loaded %s journal entries from %s", count, self._journal)
+
+    def _do_replay(self, method, url):
+        key = journal_key(method, url)
+
+        with self._lock:
+            entries = self._replay.get(key)
+            if not entries:
+                _LOGGER.warning("No journal entry for %s", key)
+                return ReplayResponse(404, "Not Recorded", "", "")
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+
+        if self._speed > 0:
+            # a response is not served before its recorded offset, so bursts
+            # and quiet periods keep their shape, then takes its recorded time
+            early = entry["t"] / self._speed - (time.monotonic() - self._started)
+            time.sleep(max(early, 0) + entry["d"] / self._speed)
+
+        return ReplayResponse(entry["s"], entry["r"], entry["c"], entry["b"])
+
+
+class RateLimiter:
+    def __init__(self, rate, burst):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
@@ -4,16 +4,31 @@
 import logging
 
 from datetime import timedelta
+from functools import partial
 
-from homeassistant.helpers.entity import Entity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfEnergy, UnitOfTime
 
+from . import profiled, track_added_elements
 from .const import (
     DEVICE_CLASS_MAP,
     DEVICE_ICON_MAP,
     DEVICE_UOM_MAP,
     DOMAIN,
+    MEASUREMENT_CLASS_MAP,
+    MEASUREMENT_UOM_MAP,
+)
+from .gigaset.const import (
+    BINARY_SENSOR_NAME,
+    HEALTH_PROBLEMS,
     SENSOR_NAME,
     STATE_UPDATE_INTERVAL,
+    SWITCH_NAME,
+    THERMOSTAT_NAME,
 )
 
 SCAN_INTERVAL = timedelta(seconds=STATE_UPDATE_INTERVAL)
@@ -23,21 +38,69 @@
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
-    client = hass.data[DOMAIN]["client"]
-    name = hass.data[DOMAIN]["name"]
+def create_entities(client, name, sensor_ids=None):
+    entities = []
 
     for sensor in set(SENSOR_NAME.values()):
-        sensor_list = client.get_sensor_list(sensor, SENSOR_NAME)
-        for sensor_id in sensor_list:
-            async_add_devices(
-                [GigasetelementsSensor(name + "_" + sensor + "_" + sensor_id, client)]
+        for sensor_id in client.get_sensor_list(sensor, SENSOR_NAME):
+            if sensor_ids is None or sensor_id in sensor_ids:
+                entities.append(
+                    GigasetelementsSensor(name + "_" + sensor + "_" + sensor_id, client)
+                )
+
+    for sensor_code, sensor_id, reading in client.get_measurement_list():
+        if sensor_ids is not None and sensor_id not in sensor_ids:
+            continue
+        sensor = {
+            **BINARY_SENSOR_NAME,
+            **SENSOR_NAME,
+            **SWITCH_NAME,
+            **THERMOSTAT_NAME,
+        }[sensor_code]
+        entities.append(
+            GigasetelementsMeasurementSensor(
+                name + "_" + sensor + "_" + sensor_id + "_" + reading,
+                client,
+                sensor_id,
+                reading,
+            )
+        )
+        if reading == "power":
+            entities.append(
+                GigasetelementsEnergySensor(
+                    name + "_" + sensor + "_" + sensor_id + "_energy",
+                    client,
+                    sensor_id,
+                )
             )
 
+    if sensor_ids is None:
+        entities.append(GigasetelementsLatencySensor(name + "_latency", client))
+        for problem in HEALTH_PROBLEMS:
+            entities.append(
+                GigasetelementsHealthSensor(
+                    name + "_health_" + problem, client, problem
+                )
+            )
+
+    return entities
+
+
+async def async_setup_entry(hass, entry, async_add_devices):
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    name = hass.data[DOMAIN][entry.entry_id]["name"]
+
+    async_add_devices(create_entities(client, name))
+    entry.async_on_unload(
+        track_added_elements(
+            hass, client, partial(create_entities, client, name), async_add_devices
+        )
+    )
+
     _LOGGER.debug("Sensor platform loaded")
 
 
-class GigasetelementsSensor(Entity):
+class GigasetelementsSensor(SensorEntity):
     def __init__(self, name, client):
         self._name = name
         self._id = name.rsplit("_", 1)[1]
@@ -46,7 +109,7 @@ def __init__(self, name, client):
         self._sensor_state = ""
         self._sensor_attributes = {}
         self._client = client
-        self._property_id = self._client._property_id.lower()
+        self._property_id = self._client.get_property_id(self._id)
         self.update()
 
         _LOGGER.info("Initialized sensor.%s", self._name)
@@ -68,13 +131,19 @@ def device_class(self):
         return DEVICE_CLASS_MAP[self._type_name]
 
     @property
-    def unit_of_measurement(self):
+    def native_unit_of_measurement(self):
         if self._type_name in ["thermostat", "climate"]:
             return DEVICE_UOM_MAP[self._type_name]
         return None
 
     @property
-    def state(self):
+    def state_class(self):
+        if self._type_name in ["thermostat", "climate"]:
+            return SensorStateClass.MEASUREMENT
+        return None
+
+    @property
+    def native_value(self):
         return self._sensor_state
 
     @property
@@ -89,12 +158,13 @@ def _set_icon(self):
         else:
             self._icon = None
 
+    @profiled
     def update(self):
         if self._type_name in ["base"]:
             (
                 self._sensor_state,
                 self._sensor_attributes,
-            ) = self._client.get_alarm_health()
+            ) = self._client.get_alarm_health(sensor_id=self._id)
         elif self._type_name in ["thermostat", "climate"]:
             (
                 self._sensor_state,
@@ -103,3 +173,153 @@ def update(self):
                 sensor_id=self._id, sensor_type=self._type_name
             )
         self._set_icon()
+
+
+class GigasetelementsMeasurementSensor(SensorEntity):
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, name, client, sensor_id, reading):
+        self._name = name
+        self._id = sensor_id
+        self._reading = reading
+        self._sensor_state = None
+        self._client = client
+        self._property_id = self._client.get_property_id(self._id)
+        self.update()
+
+        _LOGGER.info("Initialized sensor.%s", self._name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def unique_id(self):
+        return f"{self._property_id}.{self._id}.{self._reading}"
+
+    @property
+    def device_class(self):
+        return MEASUREMENT_CLASS_MAP[self._reading]
+
+    @property
+    def native_unit_of_measurement(self):
+        return MEASUREMENT_UOM_MAP[self._reading]
+
+    @property
+    def native_value(self):
+        return self._sensor_state
+
+    @profiled
+    def update(self):
+        self._sensor_state = self._client.get_measurement(self._id, self._reading)
+
+
+class GigasetelementsEnergySensor(SensorEntity):
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, name, client, sensor_id):
+        self._name = name
+        self._id = sensor_id
+        self._sensor_state = None
+        self._client = client
+        self._property_id = self._client.get_property_id(self._id)
+        self.update()
+
+        _LOGGER.info("Initialized sensor.%s", self._name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def unique_id(self):
+        return f"{self._property_id}.{self._id}.energy"
+
+    @property
+    def native_value(self):
+        return self._sensor_state
+
+    @profiled
+    def update(self):
+        self._sensor_state = self._client.get_energy(self._id)
+
+
+class GigasetelementsLatencySensor(SensorEntity):
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:timer-sand"
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, name, client):
+        self._name = name
+        self._sensor_state = None
+        self._sensor_attributes = {}
+        self._client = client
+        self._property_id = self._client.get_property_id()
+        self.update()
+
+        _LOGGER.info("Initialized sensor.%s", self._name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def unique_id(self):
+        return f"{self._property_id}.latency"
+
+    @property
+    def native_value(self):
+        return self._sensor_state
+
+    @property
+    def extra_state_attributes(self):
+        return self._sensor_attributes
+
+    @profiled
+    def update(self):
+        self._sensor_attributes = self._client.get_latency()
+        self._sensor_state = self._sensor_attributes.get("p95")
+
+
+class GigasetelementsHealthSensor(SensorEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:alert-circle-outline"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, name, client, problem):
+        self._name = name
+        self._problem = problem
+        self._sensor_state = None
+        self._sensor_attributes = {}
+        self._client = client
+        self._property_id = self._client.get_property_id()
+        self.update()
+
+        _LOGGER.info("Initialized sensor.%s", self._name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def unique_id(self):
+        return f"{self._property_id}.health.{self._problem}"
+
+    @property
+    def native_value(self):
+        return self._sensor_state
+
+    @property
+    def extra_state_attributes(self):
+        return self._sensor_attributes
+
+    @profiled
+    def update(self):
+        (
+            self._sensor_state,
+            self._sensor_attributes,
+        ) = self._client.get_fleet_health(self._problem)
@@ -0,0 +1,58 @@
+"""
+Gigaset Elements persistent storage backed by the Home Assistant store.
+"""
+import asyncio
+import logging
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import (
+    DOMAIN,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GigasetelementsStore:
+    def __init__(self, hass, name):
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, DOMAIN + "." + slugify(name))
+        self._data = {}
+        self._pending = False
+
+    def load(self):
+        self._data = (
+            asyncio.run_coroutine_threadsafe(
+                self._store.async_load(), self._hass.loop
+            ).result()
+            or {}
+        )
+
+        _LOGGER.debug("Loaded storage keys: %s", list(self._data))
+
+        return self._data
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def save(self, key, value):
+        self._data[key] = value
+        # every delayed save pushes the write back, so a pending one is kept
+        if self._pending:
+            return
+        self._pending = True
+        self._hass.add_job(
+            self._store.async_delay_save, self._data_to_save, STORAGE_SAVE_DELAY
+        )
+
+    def flush(self):
+        asyncio.run_coroutine_threadsafe(
+            self._store.async_save(self._data_to_save()), self._hass.loop
+        ).result()
+
+    def _data_to_save(self):
+        self._pending = False
+        return dict(self._data)
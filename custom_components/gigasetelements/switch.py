@@ -4,18 +4,27 @@
 import logging
 
 from datetime import datetime, timedelta
+from functools import partial
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.const import STATE_ALARM_DISARMED, STATE_OFF, STATE_ON
+from homeassistant.const import (
+    STATE_ALARM_DISARMED,
+    STATE_OFF,
+    STATE_ON,
+)
 
+from . import profiled, track_added_elements
 from .const import (
     DEVICE_CLASS_MAP,
     DEVICE_ICON_MAP,
-    DEVICE_MODE_MAP,
     DOMAIN,
+    SWITCH_TYPE,
+)
+from .gigaset.const import (
+    DEVICE_MODE_MAP,
     STATE_UPDATE_INTERVAL,
     SWITCH_NAME,
-    SWITCH_TYPE,
+    UPDATE_ALARM,
 )
 
 SCAN_INTERVAL = timedelta(seconds=STATE_UPDATE_INTERVAL)
@@ -25,30 +34,42 @@
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
-    client = hass.data[DOMAIN]["client"]
-    name = hass.data[DOMAIN]["name"]
+def create_entities(hass, client, name, sensor_ids=None):
+    entities = []
 
-    if client._alarm_switch:
+    if client._alarm_switch and sensor_ids is None:
         for mode in SWITCH_TYPE:
-            async_add_devices(
-                [
-                    GigasetelementsSwitch(
-                        hass, name + "_" + mode, client, SWITCH_TYPE[mode]
-                    )
-                ]
+            entities.append(
+                GigasetelementsSwitch(
+                    hass, name + "_" + mode, client, SWITCH_TYPE[mode]
+                )
             )
 
     for switch in set(SWITCH_NAME.values()):
-        sensor_list = client.get_sensor_list(switch, SWITCH_NAME)
-        for switch_id in sensor_list:
-            async_add_devices(
-                [
+        for switch_id in client.get_sensor_list(switch, SWITCH_NAME):
+            if sensor_ids is None or switch_id in sensor_ids:
+                entities.append(
                     GigasetelementsPlugSwitch(
                         hass, name + "_" + switch + "_" + switch_id, client
                     )
-                ]
-            )
+                )
+
+    return entities
+
+
+async def async_setup_entry(hass, entry, async_add_devices):
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    name = hass.data[DOMAIN][entry.entry_id]["name"]
+
+    async_add_devices(create_entities(hass, client, name))
+    entry.async_on_unload(
+        track_added_elements(
+            hass,
+            client,
+            partial(create_entities, hass, client, name),
+            async_add_devices,
+        )
+    )
 
     _LOGGER.debug("Switch platform loaded")
 
@@ -61,7 +82,7 @@ def __init__(self, hass, name, client):
         self._type_name = name.rsplit("_", 2)[1]
         self._state = STATE_OFF
         self._client = client
-        self._property_id = self._client._property_id.lower()
+        self._property_id = self._client.get_property_id(self._id)
         self._sensor_attributes = {}
         self._ts = 0
         self.update()
@@ -78,6 +99,7 @@ def turn_off(self, **kwargs):
         self._ts = datetime.utcnow().timestamp()
         self._state = STATE_OFF
 
+    @profiled
     def update(self):
         if datetime.utcnow().timestamp() - self._ts < STATE_UPDATE_INTERVAL * 2:
             return
@@ -127,6 +149,13 @@ def __init__(self, hass, name, client, mode):
 
         _LOGGER.info("Initialized switch.%s", name)
 
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._client.add_listener(self._handle_client_update))
+
+    def _handle_client_update(self, event_type, data):
+        if event_type == UPDATE_ALARM and self._type_name not in ["panic", "privacy"]:
+            self.schedule_update_ha_state(True)
+
     def turn_on(self, **kwargs):
         _LOGGER.debug("Update switch to on, mode %s ", self._mode)
 
@@ -147,6 +176,7 @@ def turn_off(self, **kwargs):
         else:
             self._client.set_alarm_status(STATE_ALARM_DISARMED)
 
+    @profiled
     def update(self):
         attributes = {}
 
@@ -159,6 +189,8 @@ def update(self):
                 refresh=False
             )
         attributes["state"] = self._state
+        if self._client.is_stale:
+            attributes["stale"] = True
         self._hass.custom_attributes = attributes
         self._icon = DEVICE_ICON_MAP[self._state]
 